@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Appointment
+from .models import Appointment, ArchivedAppointment, DailyRollup
 
 
 @admin.register(Appointment)
@@ -7,3 +7,33 @@ class AppointmentAdmin(admin.ModelAdmin):
     list_display = ('customer', 'barber_shop', 'service', 'date', 'start_time', 'status')
     list_filter = ('status', 'date')
     search_fields = ('customer__user__email', 'barber_shop__name')
+
+
+@admin.register(ArchivedAppointment)
+class ArchivedAppointmentAdmin(admin.ModelAdmin):
+    # Written by `manage.py archive_appointments`; history only.
+    list_display = ('customer', 'barber_shop', 'service', 'date', 'start_time', 'status', 'archived_at')
+    list_filter = ('status', 'date')
+    search_fields = ('customer__user__email', 'barber_shop__name')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    # Maintained by appointments.rollups; fix drift with `manage.py backfill_rollups --rebuild`.
+    list_display = (
+        'barber_shop', 'date', 'pending', 'accepted', 'completed', 'revenue', 'booked_minutes', 'open_minutes',
+    )
+    list_filter = ('date',)
+    search_fields = ('barber_shop__name',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
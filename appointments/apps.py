@@ -5,3 +5,6 @@ class AppointmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'appointments'
     verbose_name = 'Appointments'
+
+    def ready(self):
+        from . import signals  # noqa: F401
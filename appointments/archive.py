@@ -0,0 +1,60 @@
+"""
+Appointment archive - move finished appointments older than a cutoff out of the hot table
+
+Each batch copies up to batch_size rows into ArchivedAppointment with one
+INSERT ... SELECT and deletes them from Appointment in the same short
+transaction, so a reader sees every row in exactly one table and locks
+last one batch. Progress needs no bookkeeping: moved rows are gone from
+the hot table, so a rerun continues where an interrupted one stopped.
+
+Only terminal statuses are archived, and those are invisible to the
+occupancy index, slot cache and search index, so the raw SQL skipping
+model signals is deliberate. Shop stats count completions in both tables
+(see barbers.stats), and daily rollups cover both (see appointments.rollups).
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Appointment, ArchivedAppointment
+
+BATCH_SIZE = 500
+# Copied as-is; archived_at is set on the way in.
+COLUMNS = (
+    'id', 'customer_id', 'barber_shop_id', 'service_id', 'date', 'start_time',
+    'status', 'notes', 'created_at', 'updated_at',
+)
+
+
+def archivable(cutoff):
+    """Hot appointments that archive() would move: finished, dated before `cutoff`."""
+    return Appointment.objects.filter(status__in=ArchivedAppointment.ARCHIVABLE_STATUSES, date__lt=cutoff)
+
+
+def archive_batch(cutoff, after_id=0, batch_size=BATCH_SIZE):
+    """
+    Move the next `batch_size` archivable rows with id > after_id (scanning by
+    id keeps every batch's search short). Returns (ids moved, last id seen);
+    the last id is None once nothing is left.
+    """
+    ids = list(archivable(cutoff).filter(id__gt=after_id).order_by('id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return [], None
+
+    quote = connection.ops.quote_name
+    hot = quote(Appointment._meta.db_table)
+    cold = quote(ArchivedAppointment._meta.db_table)
+    columns = ', '.join(quote(column) for column in COLUMNS)
+    with transaction.atomic():
+        # Re-check (and on PostgreSQL lock) inside the transaction: a row may have gone meanwhile.
+        moving = list(archivable(cutoff).filter(id__in=ids).select_for_update().values_list('id', flat=True))
+        if moving:
+            placeholders = ', '.join(['%s'] * len(moving))
+            archived_at = connection.ops.adapt_datetimefield_value(timezone.now())
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {cold} ({columns}, {quote("archived_at")}) '
+                    f'SELECT {columns}, %s FROM {hot} WHERE {quote("id")} IN ({placeholders})',
+                    [archived_at, *moving],
+                )
+                cursor.execute(f'DELETE FROM {hot} WHERE {quote("id")} IN ({placeholders})', moving)
+    return moving, ids[-1]
@@ -0,0 +1,59 @@
+"""
+Booking - availability validation and conflict-safe appointment creation
+"""
+from datetime import date, datetime
+
+from django.db import transaction
+from django.db.models import F
+
+from . import occupancy
+from .models import DailyOccupancy
+from .utils import to_minutes
+
+
+class SlotUnavailable(Exception):
+    """The requested start time cannot be booked."""
+
+
+def check_slot(barber_shop, service, target_date, start_time):
+    """
+    Validate a requested slot against working hours and the clock.
+    Returns an error message, or None. Overlaps with other bookings are
+    checked once, under lock, by place_booking().
+    """
+    # Uses the shop's prefetched working hours when the caller loaded them.
+    wh = next((
+        hours for hours in barber_shop.working_hours.all()
+        if hours.day_of_week == target_date.weekday() and not hours.is_closed
+    ), None)
+    if not wh:
+        return 'The shop is closed on this day.'
+    begin = to_minutes(start_time)
+    if begin < to_minutes(wh.start_time) or begin + service.duration_minutes > to_minutes(wh.end_time):
+        return 'This time is outside the shop\'s working hours.'
+    if target_date < date.today() or (target_date == date.today() and start_time <= datetime.now().time()):
+        return 'This time has already passed.'
+    return None
+
+
+def place_booking(appointment):
+    """
+    Save a new appointment only if its slot is free. Working hours and the
+    clock are the caller's check_slot() (BookingForm.clean runs it).
+
+    The occupancy row for (shop, date) is claimed with a version-bumping
+    UPDATE before anything is read: on PostgreSQL that takes the row lock,
+    on SQLite the database write lock, so racing bookings for the same
+    shop and date validate one after another while bookings for other
+    shops or dates never wait on each other. The first booking of a day
+    finds no row and inserts it instead, which locks the same way.
+    Raises SlotUnavailable.
+    """
+    shop_id, day = appointment.barber_shop_id, appointment.date
+    with transaction.atomic():
+        claimed = DailyOccupancy.objects.filter(barber_shop_id=shop_id, date=day).update(version=F('version') + 1)
+        entries = occupancy.get_occupancy(shop_id, day) if claimed else occupancy.locked_entries(shop_id, day)
+        if occupancy.overlaps(entries, appointment.start_time, appointment.service.duration_minutes):
+            raise SlotUnavailable('This time slot is already booked. Please pick another.')
+        appointment.save()
+    return appointment
@@ -0,0 +1,66 @@
+"""
+Worker process for bench_db_concurrency (kept apart from the command so a
+spawned process can import it before Django is set up).
+"""
+import random
+import time as timer
+from datetime import date, time, timedelta
+
+import django
+from django.db import DEFAULT_DB_ALIAS, OperationalError, close_old_connections, connection, connections
+
+DAYS = 14
+# Seconds a worker may take to start and load its fixtures.
+STARTUP_TIMEOUT = 120
+
+
+def work(kind, seed, fixtures, overrides, seconds, barrier, results):
+    """One worker process: run `kind` operations for `seconds` and put (kind, timings, lost, locked)."""
+    django.setup()
+    connections.settings[DEFAULT_DB_ALIAS].update(overrides)
+    from appointments.booking import place_booking, SlotUnavailable
+    from appointments.models import Appointment
+    from appointments.utils import get_available_slots
+    from barbers.models import BarberShop, Service
+
+    rng = random.Random(seed)
+    shops = BarberShop.objects.filter(pk__in=fixtures['shops'])
+    services = {service.barber_shop_id: service for service in Service.objects.filter(barber_shop__in=shops)}
+    shops = list(shops)
+    customer_id = fixtures['customers'][seed % len(fixtures['customers'])]
+    previous = []
+
+    def read():
+        shop = rng.choice(shops)
+        get_available_slots(shop, services[shop.pk], date.today() + timedelta(days=rng.randint(1, DAYS)))
+
+    def write():
+        shop = rng.choice(shops)
+        minute = rng.randrange(0, 23 * 60, 30)
+        appointment = place_booking(Appointment(
+            customer_id=customer_id, barber_shop=shop, service=services[shop.pk],
+            date=date.today() + timedelta(days=rng.randint(1, DAYS)), start_time=time(minute // 60, minute % 60),
+        ))
+        if previous:
+            Appointment.objects.filter(pk=previous.pop()).delete()
+        previous.append(appointment.pk)
+
+    operation = read if kind == 'read' else write
+    timings, lost, locked = [], 0, 0
+    connection.close()
+    barrier.wait(STARTUP_TIMEOUT)
+    deadline = timer.perf_counter() + seconds
+    while timer.perf_counter() < deadline:
+        close_old_connections()
+        started = timer.perf_counter()
+        try:
+            operation()
+            timings.append(timer.perf_counter() - started)
+        except SlotUnavailable:
+            lost += 1
+        except OperationalError:
+            locked += 1
+        finally:
+            close_old_connections()
+    connection.close()
+    results.put((kind, timings, lost, locked))
@@ -0,0 +1,64 @@
+"""
+Move finished appointments older than a cutoff into the archive table.
+Run: python manage.py archive_appointments [--days 180 | --before 2026-01-01]
+         [--batch-size 500] [--sleep 0.05] [--max-batches N] [--dry-run]
+
+Batches are short independent transactions, so the command can run while
+the site is live and be interrupted and rerun at any point. --sleep
+pauses between batches to leave room for other writers.
+"""
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from appointments import archive
+
+
+class Command(BaseCommand):
+    help = 'Archive COMPLETED, REJECTED and CANCELLED appointments older than a cutoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=180, help='Archive appointments dated more than this many days ago')
+        parser.add_argument('--before', help='Archive appointments dated before this day (YYYY-MM-DD); overrides --days')
+        parser.add_argument('--batch-size', type=int, default=archive.BATCH_SIZE)
+        parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to pause between batches')
+        parser.add_argument('--max-batches', type=int, help='Stop after this many batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                cutoff = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError('--before must be YYYY-MM-DD.')
+        else:
+            cutoff = date.today() - timedelta(days=options['days'])
+        # Every id is a bound parameter.
+        max_params = connection.features.max_query_params
+        batch_size = min(options['batch_size'], max_params - 1) if max_params else options['batch_size']
+
+        if options['dry_run']:
+            count = archive.archivable(cutoff).count()
+            self.stdout.write(f'{count} appointment(s) dated before {cutoff} would be archived.')
+            return
+
+        moved = batches = 0
+        last_id = 0
+        started = time.perf_counter()
+        while options['max_batches'] is None or batches < options['max_batches']:
+            ids, last_id = archive.archive_batch(cutoff, last_id, batch_size)
+            if last_id is None:
+                break
+            moved += len(ids)
+            batches += 1
+            if batches % 20 == 0:
+                rate = moved / (time.perf_counter() - started)
+                self.stdout.write(f'  {moved} archived ({rate:,.0f} rows/s), up to id {last_id}')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {moved} appointment(s) dated before {cutoff} in {batches} batch(es), '
+            f'{time.perf_counter() - started:.1f}s.'
+        ))
@@ -0,0 +1,136 @@
+"""
+Backfill (or rebuild, or verify) the daily rollups from the appointment tables.
+Run: python manage.py backfill_rollups [--start YYYY-MM-DD] [--end YYYY-MM-DD] [--days N]
+     [--shop ID ...] [--rebuild | --verify] [--batch-shops 50] [--batch-days 31]
+
+Writes one DailyRollup per shop and day in the range, days without
+bookings included, so analytics have every day's open minutes. The range
+covers every appointment (hot or archived) and at least today;
+`--days 2` suits a nightly run. Existing rows are kept unless --rebuild,
+which rewrites those whose status counts disagree with the tables.
+Revenue, booked and open minutes are snapshots taken when appointments
+were written (see appointments.rollups), so a service price edit is not
+drift; a rewritten row prices its day at today's service prices. Each
+batch of shops and days is its own short transaction, so the command can
+run against a live site and an interrupted run can simply be repeated.
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from appointments import rollups
+from appointments.models import Appointment, ArchivedAppointment, DailyRollup
+from barbers.models import BarberShop
+
+
+def _date(value):
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise CommandError(f'Invalid date {value!r}; use YYYY-MM-DD.')
+    return parsed
+
+
+class Command(BaseCommand):
+    help = 'Create missing daily rollup rows (with --rebuild, also fix wrong ones; with --verify, report them)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=_date, help='First date (default: earliest appointment)')
+        parser.add_argument('--end', type=_date, help='Last date (default: latest booking, or today if later)')
+        parser.add_argument('--days', type=int, help='Only the last N days up to today, plus any later dates')
+        parser.add_argument('--shop', type=int, nargs='+', help='Limit to these shop ids')
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument('--rebuild', action='store_true',
+                          help='Also rewrite rows whose status counts disagree with the tables')
+        mode.add_argument('--verify', action='store_true', help=(
+            'Only compare status counts with the tables; exit non-zero on drift. Days without bookings '
+            'only get rows from this command, so run it without --verify first (e.g. the nightly --days run) '
+            'or missing rows are reported'
+        ))
+        parser.add_argument('--batch-shops', type=int, default=50)
+        parser.add_argument('--batch-days', type=int, default=31)
+
+    def handle(self, *args, **options):
+        shops = BarberShop.objects.order_by('pk')
+        if options['shop']:
+            shops = shops.filter(pk__in=options['shop'])
+        shop_ids = list(shops.values_list('pk', flat=True))
+        start, end = self._range(shop_ids, options)
+        if not shop_ids or start > end:
+            self.stdout.write('Nothing to do.')
+            return
+
+        totals = {'missing': 0, 'stale': 0, 'rows': 0}
+        batch_shops, batch_days = max(options['batch_shops'], 1), max(options['batch_days'], 1)
+        for first in range(0, len(shop_ids), batch_shops):
+            chunk = shop_ids[first:first + batch_shops]
+            window = start
+            while window <= end:
+                window_end = min(window + timedelta(days=batch_days - 1), end)
+                missing, stale, rows = self._batch(chunk, window, window_end, options)
+                totals['missing'] += missing
+                totals['stale'] += stale
+                totals['rows'] += rows
+                window = window_end + timedelta(days=1)
+            self.stdout.write(f'{min(first + batch_shops, len(shop_ids))}/{len(shop_ids)} shop(s) done')
+
+        summary = f"{totals['rows']} shop-day(s) from {start} to {end}"
+        if options['verify']:
+            if totals['missing'] or totals['stale']:
+                raise CommandError(
+                    f"{totals['missing']} rollup row(s) missing and {totals['stale']} out of date in {summary}."
+                )
+            self.stdout.write(self.style.SUCCESS(f'Rollups match the appointment tables for {summary}.'))
+            return
+        fixed = f", rewrote {totals['stale']}" if options['rebuild'] else f", {totals['stale']} differ (use --rebuild)"
+        self.stdout.write(self.style.SUCCESS(f"Created {totals['missing']} rollup row(s){fixed}; {summary}."))
+
+    def _range(self, shop_ids, options):
+        today = date.today()
+        first = last = today
+        for model in (Appointment, ArchivedAppointment):
+            bounds = model.objects.filter(barber_shop_id__in=shop_ids).aggregate(first=Min('date'), last=Max('date'))
+            first = min(first, bounds['first'] or first)
+            last = max(last, bounds['last'] or last)
+        end = options['end'] or last
+        if options['days']:
+            return today - timedelta(days=options['days'] - 1), end
+        return options['start'] or first, end
+
+    def _batch(self, shop_ids, start, end, options):
+        with transaction.atomic():
+            stored = DailyRollup.objects.filter(barber_shop_id__in=shop_ids, date__range=(start, end))
+            if options['rebuild']:
+                # Writers update these rows after their appointment write; waiting for
+                # them first means the tables read below include what they changed.
+                stored = stored.select_for_update()
+            stored = {(row.pop('barber_shop_id'), row.pop('date')): row
+                      for row in stored.values('barber_shop_id', 'date', *rollups.FIELDS)}
+            expected = rollups.compute(shop_ids, start, end)
+            missing = [key for key in expected if key not in stored]
+            stale = [
+                key for key, values in expected.items()
+                if key in stored and any(stored[key][f] != values[f] for f in rollups.CHECKED_FIELDS)
+            ]
+            if not options['verify']:
+                DailyRollup.objects.bulk_create(
+                    [DailyRollup(barber_shop_id=key[0], date=key[1], **expected[key]) for key in missing],
+                    ignore_conflicts=True,
+                )
+                if options['rebuild'] and stale:
+                    now = timezone.now()
+                    # Wrong counts mean the snapshots can't be trusted either; today's prices are the best left.
+                    fields = [f for f in rollups.FIELDS if f != 'open_minutes']
+                    for key in stale:
+                        DailyRollup.objects.filter(barber_shop_id=key[0], date=key[1]).update(
+                            updated_at=now, **{f: expected[key][f] for f in fields}
+                        )
+        for shop_id, day in stale:
+            self.stdout.write(self.style.WARNING(f'shop {shop_id} {day}: rollup out of date'))
+        return len(missing), len(stale), len(expected)
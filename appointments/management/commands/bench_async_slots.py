@@ -0,0 +1,97 @@
+"""
+Local WSGI vs ASGI throughput comparison for the slots endpoint.
+Run: python manage.py bench_async_slots [--requests 500] [--concurrency 32]
+
+Both sides run in-process through Django's real handlers: WSGI requests
+go through the test Client from a thread pool (one thread per in-flight
+request), ASGI requests through AsyncClient as concurrent tasks on one
+event loop. Numbers are for comparing the two paths on this machine, not
+a substitute for a load test against deployed servers.
+"""
+import asyncio
+import time as timer
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from authentication.models import Profile
+from barbers.models import BarberShop
+
+User = get_user_model()
+BENCH_USER = 'bench-async@trimtrove.local'
+
+
+class Command(BaseCommand):
+    help = 'Compare WSGI vs ASGI throughput for /appointments/slots/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=32)
+
+    def handle(self, *args, **options):
+        shop = BarberShop.objects.filter(services__isnull=False).first()
+        if shop is None:
+            raise CommandError('No shop with services found. Run seed_data first.')
+        service = shop.services.first()
+        User.objects.filter(username=BENCH_USER).delete()
+        user = User.objects.create(username=BENCH_USER)
+        Profile.objects.create(user=user)
+
+        # Spread requests over the booking window so the cache sees realistic reuse.
+        dates = [date.today() + timedelta(days=i) for i in range(31)]
+        query = [
+            {'shop_id': shop.pk, 'service_id': service.pk, 'date': dates[i % len(dates)].isoformat()}
+            for i in range(options['requests'])
+        ]
+        try:
+            with override_settings(ALLOWED_HOSTS=['*']):
+                wsgi = self._wsgi(user, query, options['concurrency'])
+                asgi = asyncio.run(self._asgi(user, query, options['concurrency']))
+        finally:
+            User.objects.filter(username=BENCH_USER).delete()
+
+        for label, (elapsed, errors) in (('WSGI (sync view)', wsgi), ('ASGI (async view)', asgi)):
+            self.stdout.write(
+                f"{label:<18} {len(query) / elapsed:8.1f} req/s  {elapsed * 1000 / len(query):6.2f} ms/req  "
+                f"errors={errors}"
+            )
+
+    def _wsgi(self, user, query, concurrency):
+        url = reverse('appointments:available_slots')
+        login = Client()
+        login.force_login(user)
+
+        def fetch(params):
+            client = Client()
+            client.cookies = login.cookies
+            try:
+                return client.get(url, params).status_code
+            finally:
+                connection.close()
+
+        started = timer.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            statuses = list(pool.map(fetch, query))
+        return timer.perf_counter() - started, sum(1 for s in statuses if s != 200)
+
+    async def _asgi(self, user, query, concurrency):
+        url = reverse('appointments:available_slots_async')
+        login = Client()
+        await asyncio.to_thread(login.force_login, user)
+        client = AsyncClient()
+        client.cookies = login.cookies
+        gate = asyncio.Semaphore(concurrency)
+
+        async def fetch(params):
+            async with gate:
+                return (await client.get(url, params)).status_code
+
+        started = timer.perf_counter()
+        statuses = await asyncio.gather(*(fetch(params) for params in query))
+        return timer.perf_counter() - started, sum(1 for s in statuses if s != 200)
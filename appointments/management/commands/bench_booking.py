@@ -0,0 +1,114 @@
+"""
+Multi-threaded booking contention benchmark.
+Run: python manage.py bench_booking [--threads 16] [--rounds 20]
+
+"contended": every thread races for the same slot each round.
+"uncontended": every thread books its own shop, so nothing should block.
+Reports throughput, lost races, lock errors and double bookings. Fixture
+data is committed (threads need to see it) and deleted afterwards.
+"""
+import threading
+import time as timer
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from authentication.models import Profile
+from appointments.booking import place_booking, SlotUnavailable
+from appointments.models import Appointment
+from barbers.models import BarberShop, Service, WorkingHours
+
+User = get_user_model()
+PREFIX = 'bench-booking-'
+
+
+class Command(BaseCommand):
+    help = 'Hammer one slot from many threads and report throughput and double bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--rounds', type=int, default=20, help='Slots raced for per mode')
+
+    def handle(self, *args, **options):
+        threads, rounds = options['threads'], options['rounds']
+        self._cleanup()
+        try:
+            barber = Profile.objects.create(
+                user=User.objects.create(username=f'{PREFIX}barber'), role=Profile.Role.BARBER
+            )
+            customers = [
+                Profile.objects.create(user=User.objects.create(username=f'{PREFIX}c{i}'))
+                for i in range(threads)
+            ]
+            shops = []
+            for i in range(threads):
+                shop = BarberShop.objects.create(name=f'{PREFIX}{i}', address='-', created_by=barber)
+                Service.objects.create(barber_shop=shop, name='Haircut', price=150, duration_minutes=30)
+                WorkingHours.objects.bulk_create([
+                    WorkingHours(barber_shop=shop, day_of_week=d, start_time=time(0, 0), end_time=time(23, 59))
+                    for d in range(7)
+                ])
+                shops.append(shop)
+
+            for mode in ('contended', 'uncontended'):
+                self._run(mode, shops, customers, rounds)
+        finally:
+            self._cleanup()
+
+    def _run(self, mode, shops, customers, rounds):
+        threads = len(customers)
+        target_date = date.today() + timedelta(days=7 if mode == 'contended' else 8)
+        results = {'booked': 0, 'lost': 0, 'locked': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(threads)
+
+        def worker(i):
+            shop = shops[0] if mode == 'contended' else shops[i]
+            service = shop.services.get()
+            try:
+                for r in range(rounds):
+                    barrier.wait()
+                    appointment = Appointment(
+                        customer=customers[i], barber_shop=shop, service=service,
+                        date=target_date, start_time=time(r // 2, 30 * (r % 2)),
+                    )
+                    try:
+                        place_booking(appointment)
+                        outcome = 'booked'
+                    except SlotUnavailable:
+                        outcome = 'lost'
+                    except OperationalError:
+                        outcome = 'locked'
+                    with lock:
+                        results[outcome] += 1
+            finally:
+                connection.close()
+
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        started = timer.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        elapsed = timer.perf_counter() - started
+
+        double = 0
+        for shop in (shops[:1] if mode == 'contended' else shops):
+            per_slot = {}
+            for start in Appointment.objects.filter(
+                barber_shop=shop, date=target_date, status__in=['PENDING', 'ACCEPTED']
+            ).values_list('start_time', flat=True):
+                per_slot[start] = per_slot.get(start, 0) + 1
+            double += sum(n - 1 for n in per_slot.values() if n > 1)
+
+        attempts = threads * rounds
+        self.stdout.write(
+            f"{mode:<12} attempts={attempts} booked={results['booked']} lost={results['lost']} "
+            f"locked={results['locked']} double_bookings={double} "
+            f"throughput={attempts / elapsed:.1f} req/s"
+        )
+
+    def _cleanup(self):
+        User.objects.filter(username__startswith=PREFIX).delete()
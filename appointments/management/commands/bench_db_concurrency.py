@@ -0,0 +1,156 @@
+"""
+Mixed slot-read / booking-write concurrency benchmark for the database connection layer.
+Run: python manage.py bench_db_concurrency [--readers 4] [--writers 2] [--seconds 10] [--shops 20]
+
+Reader processes compute slot lists uncached (get_available_slots);
+writer processes book a random slot with place_booking and delete their
+previous booking. Workers are processes, like web workers, so one GIL
+does not hide the database waits; use about as many as the machine has
+cores, beyond that they mostly compete for CPU. Each operation runs like
+a request: old connections are closed before and after it, so
+CONN_MAX_AGE applies as it would in a web worker.
+
+On SQLite the load runs twice: "stock" (Django's SQLite backend, rollback
+journal, a new connection per request - the settings before the tuned
+backend) and "configured" (DATABASES as configured). Other databases run
+the configured profile only. Reports throughput, p50/p95 latency and
+lock errors. Fixture data is committed (workers need to see it) and
+deleted afterwards.
+"""
+import multiprocessing
+import queue as queues
+import sqlite3
+from contextlib import closing
+from datetime import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from authentication.models import Profile
+from barbers.models import BarberShop, Service, WorkingHours
+from ._db_load import STARTUP_TIMEOUT, work
+
+User = get_user_model()
+PREFIX = 'bench-db-'
+# DATABASES["default"] overrides per profile.
+PROFILES = {
+    'stock': {'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {}, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+    'configured': {},
+}
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Measure slot-read and booking-write throughput under concurrent load, stock vs configured database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=10.0, help='Duration of each profile run')
+        parser.add_argument('--shops', type=int, default=20)
+
+    def handle(self, *args, **options):
+        self._cleanup()
+        try:
+            fixtures = self._fixtures(options['shops'], max(options['writers'], 1))
+            profiles = ['stock', 'configured'] if connection.vendor == 'sqlite' else ['configured']
+            self.stdout.write(
+                f"{options['readers']} reader(s), {options['writers']} writer(s), "
+                f"{options['seconds']:g}s per profile, {options['shops']} shops"
+            )
+            self.stdout.write(
+                f"{'profile':<12}{'reads/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+                f"{'writes/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'lost':>7}{'locked':>8}"
+            )
+            results = {}
+            for profile in profiles:
+                results[profile] = self._run(profile, fixtures, options)
+                self._report(profile, results[profile], options['seconds'])
+            if len(results) == 2:
+                stock, configured = results['stock'], results['configured']
+
+                def ratio(*kinds):
+                    return sum(len(configured[k]) for k in kinds) / max(sum(len(stock[k]) for k in kinds), 1)
+                self.stdout.write(
+                    f"configured vs stock: reads x{ratio('read'):.2f}, writes x{ratio('write'):.2f}, "
+                    f"all operations x{ratio('read', 'write'):.2f}"
+                )
+        finally:
+            # Reconnects with the configured settings, which restores WAL after the stock run.
+            self._cleanup()
+
+    def _fixtures(self, shop_count, customer_count):
+        barber = Profile.objects.create(
+            user=User.objects.create(username=f'{PREFIX}barber'), role=Profile.Role.BARBER
+        )
+        customers = [
+            Profile.objects.create(user=User.objects.create(username=f'{PREFIX}c{i}')) for i in range(customer_count)
+        ]
+        shops = []
+        for i in range(shop_count):
+            shop = BarberShop.objects.create(name=f'{PREFIX}{i}', address='-', created_by=barber)
+            Service.objects.create(barber_shop=shop, name='Haircut', price=150, duration_minutes=30)
+            WorkingHours.objects.bulk_create([
+                WorkingHours(barber_shop=shop, day_of_week=d, start_time=time(0, 0), end_time=time(23, 59))
+                for d in range(7)
+            ])
+            shops.append(shop.pk)
+        return {'shops': shops, 'customers': [customer.pk for customer in customers]}
+
+    def _run(self, profile, fixtures, options):
+        connection.close()
+        if profile == 'stock':
+            # The journal mode is stored in the file; stock SQLite uses the rollback journal.
+            with closing(sqlite3.connect(str(connection.settings_dict['NAME']))) as raw:
+                raw.execute('PRAGMA journal_mode = DELETE')
+        else:
+            # Apply the configured journal mode once, before the workers race to.
+            connection.ensure_connection()
+            connection.close()
+
+        context = multiprocessing.get_context('spawn')
+        kinds = ['read'] * options['readers'] + ['write'] * options['writers']
+        barrier = context.Barrier(len(kinds))
+        queue = context.Queue()
+        workers = [
+            context.Process(target=work, args=(
+                kind, seed, fixtures, PROFILES[profile], options['seconds'], barrier, queue,
+            ))
+            for seed, kind in enumerate(kinds)
+        ]
+        for worker in workers:
+            worker.start()
+        results = {'read': [], 'write': [], 'lost': 0, 'locked': 0}
+        for _ in workers:
+            try:
+                kind, timings, lost, locked = queue.get(timeout=options['seconds'] + STARTUP_TIMEOUT)
+            except queues.Empty:
+                for worker in workers:
+                    worker.terminate()
+                raise CommandError('A worker process failed; see its traceback above.')
+            results[kind].extend(timings)
+            results['lost'] += lost
+            results['locked'] += locked
+        for worker in workers:
+            worker.join()
+        return results
+
+    def _report(self, profile, results, seconds):
+        reads, writes = sorted(results['read']), sorted(results['write'])
+
+        def latency(values):
+            if not values:
+                return f"{'-':>9}{'-':>9}"
+            return f'{percentile(values, 0.5) * 1000:>9.1f}{percentile(values, 0.95) * 1000:>9.1f}'
+
+        self.stdout.write(
+            f'{profile:<12}{len(reads) / seconds:>10.1f}{latency(reads)}'
+            f"{len(writes) / seconds:>10.1f}{latency(writes)}{results['lost']:>7}{results['locked']:>8}"
+        )
+
+    def _cleanup(self):
+        User.objects.filter(username__startswith=PREFIX).delete()
@@ -0,0 +1,257 @@
+"""
+Benchmark suite for the booking hot paths, with a stored baseline.
+Run: python manage.py bench_hot_paths [--scales small medium] [--iterations 50]
+         [--output bench_results.json] [--baseline bench_baseline.json] [--save-baseline]
+
+For each data scale, generate_data fills the database inside a transaction
+that is rolled back afterwards, so the suite can run against any database.
+That transaction never commits, so on_commit hooks (slot cache version
+bumps, task enqueues) are captured and run right after every measured
+call, as autocommit would run them in production; their time and queries
+count towards the call. Each case is measured in three passes: wall-clock latency (p50/p95/p99),
+SQL queries per call, and peak Python memory (tracemalloc, separately,
+since tracing slows everything down). Views are driven through the test
+client, so middleware, templates and session handling are included.
+
+With --baseline, results are compared case by case; the command fails if
+any latency or memory figure is more than --threshold worse (ignoring
+differences under --min-delta-ms) or any case runs an extra query per call.
+"""
+import json
+import platform
+import random
+import time as timer
+import tracemalloc
+from datetime import date, timedelta
+from io import StringIO
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from appointments.utils import get_available_slots
+from barbers.models import Service
+
+User = get_user_model()
+
+# generate_data arguments per scale.
+SCALES = {
+    'small': {'barbers': 10, 'shops': 20, 'customers': 500, 'months': 1, 'appointments_per_day': 8},
+    'medium': {'barbers': 60, 'shops': 200, 'customers': 10000, 'months': 3, 'appointments_per_day': 12},
+    'large': {'barbers': 100, 'shops': 500, 'customers': 50000, 'months': 12, 'appointments_per_day': 12},
+}
+SEARCH_TERMS = ['koramangala', 'royal', 'fade studio', 'massage', 'keratin', 'whitefield', 'crown cuts']
+MEMORY_ITERATIONS = 5
+# Cases the suite runs, in order.
+CASES = (
+    'get_available_slots',
+    'available_slots',
+    'book_appointment',
+    'customers.dashboard',
+    'shop_list_search',
+    'barbers.appointments',
+)
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Measure latency percentiles, query counts and peak memory of the booking hot paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['small', 'medium'])
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--output', default='bench_results.json')
+        parser.add_argument('--baseline', help='Compare against this results file')
+        parser.add_argument('--save-baseline', action='store_true', help='Also write the results to --baseline')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Allowed relative slowdown / memory growth (0.25 = 25%%)')
+        parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                            help='Ignore latency differences smaller than this')
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline needs --baseline PATH.')
+        self.iterations = options['iterations']
+        results = {
+            'meta': {
+                'date': date.today().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'iterations': self.iterations,
+                'on_commit': 'run after each call',
+            },
+            'scales': {},
+        }
+        # A private cache so cached slots can't leak between scales (shop ids are reused after rollback).
+        bench_cache = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                   'LOCATION': 'trimtrove-bench'}}
+        with override_settings(ALLOWED_HOSTS=['*'], CACHES=bench_cache):
+            for scale in options['scales']:
+                self.rng = random.Random(options['seed'])
+                cache.clear()
+                with transaction.atomic():
+                    results['scales'][scale] = self._run_scale(scale)
+                    transaction.set_rollback(True)
+
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        self.stdout.write(f'Results written to {options["output"]}')
+
+        if options['baseline']:
+            if options['save_baseline']:
+                with open(options['baseline'], 'w') as f:
+                    json.dump(results, f, indent=2, sort_keys=True)
+                self.stdout.write(self.style.SUCCESS(f'Baseline saved to {options["baseline"]}'))
+            else:
+                self._compare(results, options['baseline'], options['threshold'], options['min_delta_ms'])
+
+    def _run_scale(self, scale):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Scale: {scale} {SCALES[scale]}'))
+        self.stdout.write('  (rolled back afterwards; on_commit hooks run after each measured call)')
+        started = timer.perf_counter()
+        prefix = f'bench-{scale}'
+        call_command('generate_data', prefix=prefix, seed=1, stdout=StringIO(), **SCALES[scale])
+        self.stdout.write(f'  data generated in {timer.perf_counter() - started:.1f}s')
+
+        customer = User.objects.get(username=f'{prefix}-customer-0@trimtrove.local')
+        barber = User.objects.get(username=f'{prefix}-barber-0@trimtrove.local')
+        self.customer_client, self.barber_client = Client(), Client()
+        self.customer_client.force_login(customer)
+        self.barber_client.force_login(barber)
+        self.services = list(Service.objects.select_related('barber_shop').filter(
+            barber_shop__created_by__user__username__startswith=prefix
+        ))
+        self.upcoming = [date.today() + timedelta(days=d) for d in range(1, 14)]
+
+        results = {}
+        self.stdout.write(f"  {'case':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'peak KB':>8}")
+        for case in CASES:
+            call = getattr(self, '_case_' + case.replace('.', '_'))
+            result = self._measure(call)
+            results[case] = result
+            self.stdout.write(
+                f"  {case:<22} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                f"{result['queries']:>8.1f} {result['peak_kb']:>8.0f}"
+            )
+        return results
+
+    def _committed(self, run):
+        # Wrap a thunk so the on_commit hooks it registers run when it returns.
+        def committed():
+            with TestCase.captureOnCommitCallbacks(execute=True):
+                run()
+        return committed
+
+    def _measure(self, call):
+        # Each call() prepares its inputs and returns a thunk; only the thunk is timed.
+        self._committed(call())()
+        timings = []
+        for _ in range(self.iterations):
+            run = self._committed(call())
+            started = timer.perf_counter()
+            run()
+            timings.append((timer.perf_counter() - started) * 1000)
+        timings.sort()
+
+        queries = 0
+        for _ in range(MEMORY_ITERATIONS):
+            run = self._committed(call())
+            with CaptureQueriesContext(connection) as captured:
+                run()
+            queries += len(captured.captured_queries)
+
+        peak = 0
+        for _ in range(MEMORY_ITERATIONS):
+            run = self._committed(call())
+            tracemalloc.start()
+            try:
+                run()
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+
+        return {
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'queries': queries / MEMORY_ITERATIONS,
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+    def _pick(self):
+        service = self.rng.choice(self.services)
+        return service.barber_shop, service, self.rng.choice(self.upcoming)
+
+    def _check(self, response, expected=200):
+        if response.status_code != expected:
+            raise CommandError(f'{response.request["PATH_INFO"]} returned {response.status_code}, expected {expected}')
+
+    def _case_get_available_slots(self):
+        shop, service, day = self._pick()
+        return lambda: get_available_slots(shop, service, day, include_past=True)
+
+    def _case_available_slots(self):
+        shop, service, day = self._pick()
+        params = {'shop_id': shop.pk, 'service_id': service.pk, 'date': day.isoformat()}
+        return lambda: self._check(self.customer_client.get(reverse('appointments:available_slots'), params))
+
+    def _case_book_appointment(self):
+        # Find a free slot first; booking it is what gets timed.
+        while True:
+            shop, service, day = self._pick()
+            slots = get_available_slots(shop, service, day)
+            if slots:
+                break
+        data = {'service': service.pk, 'date': day.isoformat(),
+                'start_time': self.rng.choice(slots)[0].strftime('%H:%M'), 'notes': ''}
+        url = reverse('customers:book', args=[shop.pk])
+        return lambda: self._check(self.customer_client.post(url, data), expected=302)
+
+    def _case_customers_dashboard(self):
+        return lambda: self._check(self.customer_client.get(reverse('customers:dashboard')))
+
+    def _case_shop_list_search(self):
+        params = {'q': self.rng.choice(SEARCH_TERMS)}
+        return lambda: self._check(self.customer_client.get(reverse('customers:shops'), params))
+
+    def _case_barbers_appointments(self):
+        return lambda: self._check(self.barber_client.get(reverse('barbers:appointments')))
+
+    def _compare(self, results, baseline_path, threshold, min_delta_ms):
+        try:
+            with open(baseline_path) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            raise CommandError(f'Baseline {baseline_path} not found; create it with --save-baseline.')
+
+        regressions = []
+        for scale, cases in results['scales'].items():
+            for case, now in cases.items():
+                before = baseline.get('scales', {}).get(scale, {}).get(case)
+                if before is None:
+                    continue
+                for metric in ('p50_ms', 'p95_ms', 'peak_kb'):
+                    limit = before[metric] * (1 + threshold)
+                    floor = min_delta_ms if metric.endswith('_ms') else 0
+                    if now[metric] > limit and now[metric] - before[metric] > floor:
+                        regressions.append(f'{scale}/{case} {metric}: {before[metric]} -> {now[metric]}')
+                # Query counts are averaged over a few random picks; a real regression adds a whole query.
+                if now['queries'] - before['queries'] >= 1:
+                    regressions.append(f'{scale}/{case} queries: {before["queries"]} -> {now["queries"]}')
+
+        if regressions:
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(f'REGRESSION {line}'))
+            raise CommandError(f'{len(regressions)} regression(s) against {baseline_path}.')
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {baseline_path} (threshold {threshold:.0%}).'))
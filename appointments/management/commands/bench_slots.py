@@ -0,0 +1,69 @@
+"""
+Benchmark the slot engine: query count and latency vs. working-day length.
+Run: python manage.py bench_slots
+All fixture data is created inside a transaction that is rolled back.
+"""
+import time as timer
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from authentication.models import Profile
+from appointments.models import Appointment
+from appointments.utils import get_available_slots
+from barbers.models import BarberShop, Service, WorkingHours
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Show that get_available_slots runs a constant number of queries as the day gets longer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, nargs='+', default=[4, 8, 11, 16, 23],
+                            help='Working-day lengths (hours) to measure')
+        parser.add_argument('--repeat', type=int, default=50, help='Calls per measurement')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options['hours'], options['repeat'])
+            transaction.set_rollback(True)
+
+    def _run(self, hours_list, repeat):
+        user = User.objects.create(username='bench-slots@trimtrove.local')
+        profile = Profile.objects.create(user=user, role=Profile.Role.BARBER)
+        customer = Profile.objects.create(
+            user=User.objects.create(username='bench-customer@trimtrove.local'),
+            role=Profile.Role.CUSTOMER,
+        )
+        target_date = date.today() + timedelta(days=1)
+
+        self.stdout.write(f"{'hours':>5} {'slots':>6} {'queries':>8} {'ms/call':>8}")
+        for hours in hours_list:
+            shop = BarberShop.objects.create(name=f'Bench {hours}h', address='-', created_by=profile)
+            service = Service.objects.create(barber_shop=shop, name='Haircut', price=150, duration_minutes=30)
+            WorkingHours.objects.create(
+                barber_shop=shop,
+                day_of_week=target_date.weekday(),
+                start_time=time(0, 30),
+                end_time=time(min(hours, 23), 30),
+            )
+            # Book every third half-hour so the engine has real intervals to skip.
+            Appointment.objects.bulk_create([
+                Appointment(customer=customer, barber_shop=shop, service=service,
+                            date=target_date, start_time=time(h, 30))
+                for h in range(0, min(hours, 23), 3)
+            ])
+
+            # First call builds the occupancy index row; measure steady-state reads.
+            get_available_slots(shop, service, target_date)
+            with CaptureQueriesContext(connection) as ctx:
+                slots = get_available_slots(shop, service, target_date)
+            started = timer.perf_counter()
+            for _ in range(repeat):
+                get_available_slots(shop, service, target_date)
+            elapsed_ms = (timer.perf_counter() - started) * 1000 / repeat
+            self.stdout.write(f'{hours:>5} {len(slots):>6} {len(ctx.captured_queries):>8} {elapsed_ms:>8.2f}')
@@ -0,0 +1,105 @@
+"""
+Query-plan regression check for the Appointment hot paths.
+Run: python manage.py check_query_plans [--verbose-plans]
+
+Runs EXPLAIN on each hot query and exits non-zero if any of them reads
+a hot table with a full scan instead of an index search, or sorts its
+result instead of reading it in index order (a sort reads every matching
+row before LIMIT applies, so its cost grows with the history). Supports
+SQLite (EXPLAIN QUERY PLAN) and PostgreSQL (EXPLAIN with seq scans
+disabled, so small dev tables don't mask a missing index).
+"""
+import re
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from appointments import occupancy, pagination
+from appointments.models import Appointment, ArchivedAppointment, DailyOccupancy
+from barbers.models import WorkingHours
+
+HOT_TABLES = (
+    Appointment._meta.db_table,
+    ArchivedAppointment._meta.db_table,
+    DailyOccupancy._meta.db_table,
+    WorkingHours._meta.db_table,
+)
+
+
+def hot_queries():
+    """(label, queryset) pairs mirroring the queries the hot views run."""
+    today = date.today()
+    shop_id, profile_id = 1, 1
+    shop_ids = [shop_id, 2]
+
+    def keyset(queryset):
+        # A page deep into the history, as infinite scroll requests it.
+        return pagination.after_cursor(queryset, f'{today.isoformat()}_10:00:00_1')[:pagination.PAGE_SIZE + 1]
+
+    return [
+        ('slot engine / occupancy build',
+         occupancy.active_bookings(shop_id, [today + timedelta(days=d) for d in range(0, 30, 3)])),
+        ('occupancy index read',
+         DailyOccupancy.objects.filter(barber_shop_id=shop_id, date__range=(today, today + timedelta(days=30)))),
+        ('working hours for a day',
+         WorkingHours.objects.filter(barber_shop_id=shop_id, day_of_week=today.weekday(), is_closed=False)),
+        ('customers.views.appointments',
+         keyset(Appointment.objects.filter(customer_id=profile_id))),
+        ('customers.views.appointments (archive)',
+         keyset(ArchivedAppointment.objects.filter(customer_id=profile_id))),
+        # Barber views run one query per owned shop and merge the results.
+        ('barbers.views.dashboard (per shop)',
+         Appointment.objects.exclude(status__in=['CANCELLED', 'REJECTED'])
+         .order_by('date', 'start_time').filter(barber_shop_id=shop_id)[:20]),
+        ('barbers.views.appointments (per shop)',
+         keyset(Appointment.objects.filter(barber_shop_id__in=shop_ids).filter(barber_shop_id=shop_id))),
+        ('barbers.views.appointments (archive, per shop)',
+         keyset(ArchivedAppointment.objects.filter(barber_shop_id__in=shop_ids).filter(barber_shop_id=shop_id))),
+    ]
+
+
+def full_scans(plan):
+    """Hot tables the plan reads without an index."""
+    tables = '|'.join(HOT_TABLES)
+    if connection.vendor == 'postgresql':
+        pattern = rf'Seq Scan on "?({tables})"?'
+    else:
+        # SQLite: "SCAN t" is a table scan; "SEARCH t USING INDEX" is fine.
+        pattern = rf'\bSCAN ({tables})\b(?! USING (?:COVERING )?INDEX)'
+    return sorted(set(re.findall(pattern, plan)))
+
+
+def sorts(plan):
+    """Whether the plan sorts rows instead of reading them in index order."""
+    if connection.vendor == 'postgresql':
+        # "Incremental Sort" only orders ties of an index-ordered prefix.
+        return bool(re.search(r'^\s*(?:->\s*)?Sort\b', plan, re.MULTILINE))
+    # "USE TEMP B-TREE FOR RIGHT PART OF ORDER BY" only orders ties of an
+    # index-ordered prefix, so LIMIT still stops the scan early.
+    return 'USE TEMP B-TREE FOR ORDER BY' in plan
+
+
+class Command(BaseCommand):
+    help = 'Fail if any Appointment hot-path query falls back to a full table scan or a sort'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan')
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for label, queryset in hot_queries():
+                plan = queryset.explain()
+                problems = [*(['FULL SCAN'] if full_scans(plan) else []), *(['SORT'] if sorts(plan) else [])]
+                status = self.style.ERROR(' + '.join(problems)) if problems else self.style.SUCCESS('ok')
+                self.stdout.write(f'{label:<48} {status}')
+                if problems or options['verbose_plans']:
+                    self.stdout.write('    ' + plan.replace('\n', '\n    '))
+                if problems:
+                    failures.append(label)
+        if failures:
+            raise CommandError(f"Full table scan or sort in: {', '.join(failures)}")
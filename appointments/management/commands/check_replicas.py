@@ -0,0 +1,113 @@
+"""
+Routing check: reads go to a replica, a write pins the client to the primary, the pin expires.
+Run: DATABASE_REPLICAS=replica1.sqlite3,replica2.sqlite3 python manage.py check_replicas
+
+Refreshes the replicas (sync_replicas) and drives ReplicaMiddleware with
+RequestFactory requests through both a sync and an async view chain,
+recording where the router sends each read. A GET must read a replica
+(the sync chain also runs the query and finds it on the replica
+connection) while sessions stay on the primary; a write inside a request
+must move its later reads to the primary and set the pin cookie; a GET
+carrying that cookie must read the primary; use_primary() must override
+the replica; and once REPLICA_PIN_SECONDS have passed the same cookie
+must no longer pin. The write is an UPDATE that matches no rows.
+"""
+import asyncio
+import time
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from barbers.models import BarberShop
+from trimtrove.replicas import PIN_COOKIE, ReplicaMiddleware, replica_aliases, use_primary
+
+PIN_SECONDS = 1
+
+
+class Command(BaseCommand):
+    help = 'Fail if reads are not routed to replicas or writes do not pin the client to the primary'
+
+    def handle(self, *args, **options):
+        self.replicas = replica_aliases()
+        if not self.replicas:
+            raise CommandError('No replicas configured; set DATABASE_REPLICAS to a comma-separated list of files.')
+        if all(connections[alias].vendor == 'sqlite' for alias in (DEFAULT_DB_ALIAS, *self.replicas)):
+            call_command('sync_replicas', stdout=StringIO())
+        self.factory = RequestFactory()
+        self.failures = []
+        with override_settings(REPLICA_PIN_SECONDS=PIN_SECONDS):
+            for chain in ('sync', 'async'):
+                self._scenario(chain)
+        if self.failures:
+            raise CommandError(f'{len(self.failures)} replica routing check(s) failed: {", ".join(self.failures)}')
+        self.stdout.write(self.style.SUCCESS('Reads use the replicas; a write pins the client to the primary until it expires.'))
+
+    def _scenario(self, chain):
+        reads, response = self._request(chain, 'GET', {}, write=False)
+        self._expect(f'{chain}: GET reads a replica', reads['before'] in self.replicas, reads['before'])
+        self._expect(f'{chain}: sessions read the primary', reads['session'] == DEFAULT_DB_ALIAS, reads['session'])
+        self._expect(f'{chain}: use_primary() reads the primary', reads['forced'] == DEFAULT_DB_ALIAS, reads['forced'])
+        if chain == 'sync':
+            self._expect(f'{chain}: query ran on the replica', reads['ran_on'] == reads['before'], reads['ran_on'])
+        self._expect(f'{chain}: GET without a write sets no pin', PIN_COOKIE not in response.cookies, '-')
+
+        reads, response = self._request(chain, 'GET', {}, write=True)
+        self._expect(f'{chain}: reads after a write use the primary', reads['after'] == DEFAULT_DB_ALIAS, reads['after'])
+        pin = response.cookies.get(PIN_COOKIE)
+        self._expect(f'{chain}: a write sets the pin cookie', pin is not None, pin.value if pin else '-')
+        cookies = {PIN_COOKIE: pin.value} if pin else {}
+
+        reads, _ = self._request(chain, 'GET', cookies, write=False)
+        self._expect(f'{chain}: pinned GET reads the primary', reads['before'] == DEFAULT_DB_ALIAS, reads['before'])
+        reads, response = self._request(chain, 'POST', {}, write=False)
+        self._expect(f'{chain}: POST reads the primary', reads['before'] == DEFAULT_DB_ALIAS, reads['before'])
+        self._expect(f'{chain}: POST sets the pin cookie', PIN_COOKIE in response.cookies, '-')
+
+        time.sleep(PIN_SECONDS + 0.1)
+        reads, _ = self._request(chain, 'GET', cookies, write=False)
+        self._expect(f'{chain}: expired pin reads a replica', reads['before'] in self.replicas, reads['before'])
+
+    def _request(self, chain, method, cookies, write):
+        request = getattr(self.factory, method.lower())('/')
+        request.COOKIES.update(cookies)
+        reads = {}
+
+        def route():
+            reads['before'] = BarberShop.objects.all().db
+            reads['session'] = Session.objects.all().db
+            with use_primary():
+                reads['forced'] = BarberShop.objects.all().db
+
+        if chain == 'sync':
+            def view(request):
+                route()
+                with CaptureQueriesContext(connections[reads['before']]) as captured:
+                    BarberShop.objects.exists()
+                reads['ran_on'] = reads['before'] if captured.captured_queries else DEFAULT_DB_ALIAS
+                if write:
+                    BarberShop.objects.filter(pk=0).update(name=F('name'))
+                reads['after'] = BarberShop.objects.all().db
+                return HttpResponse()
+            return reads, ReplicaMiddleware(view)(request)
+
+        async def view(request):
+            route()
+            if write:
+                # The write runs in a worker thread; the routing state must still reach this request.
+                await BarberShop.objects.filter(pk=0).aupdate(name=F('name'))
+            reads['after'] = BarberShop.objects.all().db
+            return HttpResponse()
+        return reads, asyncio.run(ReplicaMiddleware(view)(request))
+
+    def _expect(self, label, ok, seen):
+        status = self.style.SUCCESS('ok') if ok else self.style.ERROR('FAIL')
+        self.stdout.write(f'{label:<44} {seen:<10} {status}')
+        if not ok:
+            self.failures.append(label)
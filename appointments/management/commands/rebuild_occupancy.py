@@ -0,0 +1,56 @@
+"""
+Rebuild or verify the occupancy index from the Appointment table.
+Run: python manage.py rebuild_occupancy [--verify] [--shop ID ...]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from appointments import occupancy
+from appointments.models import Appointment, DailyOccupancy
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or with --verify, check) the per-shop daily occupancy index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Only compare the index with the Appointment table; exit non-zero on drift')
+        parser.add_argument('--shop', type=int, nargs='+', help='Limit to these shop ids')
+
+    def handle(self, *args, **options):
+        rows = DailyOccupancy.objects.all()
+        appointments = Appointment.objects.filter(status__in=occupancy.ACTIVE_STATUSES)
+        if options['shop']:
+            rows = rows.filter(barber_shop_id__in=options['shop'])
+            appointments = appointments.filter(barber_shop_id__in=options['shop'])
+
+        # Every indexed date plus every date that has an active booking.
+        keys = {}
+        for shop_id, day in rows.values_list('barber_shop_id', 'date'):
+            keys.setdefault(shop_id, set()).add(day)
+        for shop_id, day in appointments.values_list('barber_shop_id', 'date').distinct():
+            keys.setdefault(shop_id, set()).add(day)
+
+        if options['verify']:
+            self._verify(keys)
+        else:
+            for shop_id, dates in keys.items():
+                occupancy.refresh(shop_id, dates)
+            total = sum(len(dates) for dates in keys.values())
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} occupancy row(s) for {len(keys)} shop(s).'))
+
+    def _verify(self, keys):
+        drift = 0
+        for shop_id, dates in keys.items():
+            stored = {
+                row.date: row.bookings
+                for row in DailyOccupancy.objects.filter(barber_shop_id=shop_id, date__in=dates)
+            }
+            expected = occupancy.entries_from_table(shop_id, dates)
+            for day in sorted(dates):
+                # A missing row is fine: it is built from the table on first read.
+                if day in stored and stored[day] != expected.get(day, []):
+                    drift += 1
+                    self.stdout.write(self.style.WARNING(f'shop {shop_id} {day}: index out of date'))
+        if drift:
+            raise CommandError(f'{drift} occupancy row(s) disagree with the Appointment table.')
+        self.stdout.write(self.style.SUCCESS('Occupancy index matches the Appointment table.'))
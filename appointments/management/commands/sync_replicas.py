@@ -0,0 +1,56 @@
+"""
+Copy the primary SQLite database into the replica files of a local replica setup.
+Run: DATABASE_REPLICAS=replica1.sqlite3,replica2.sqlite3 python manage.py sync_replicas [--every 2]
+
+Stands in for streaming replication when the replicas are SQLite files:
+each pass snapshots the primary into every replica with SQLite's online
+backup API, so readers on either side keep working. With --every the
+copy repeats and the replicas trail the primary by up to that many
+seconds, which is the lag REPLICA_PIN_SECONDS must cover.
+"""
+import sqlite3
+import time
+from contextlib import closing
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from trimtrove.replicas import replica_aliases
+
+
+def _sqlite_path(alias):
+    connection = connections[alias]
+    if connection.vendor != 'sqlite':
+        raise CommandError(f'Database "{alias}" is not SQLite; use the database\'s own replication.')
+    return str(connection.settings_dict['NAME'])
+
+
+class Command(BaseCommand):
+    help = 'Snapshot the primary SQLite database into the local replica files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=float, help='Repeat every this many seconds until interrupted')
+
+    def handle(self, *args, **options):
+        aliases = replica_aliases()
+        if not aliases:
+            raise CommandError('No replicas configured; set DATABASE_REPLICAS to a comma-separated list of files.')
+        source_path = _sqlite_path(DEFAULT_DB_ALIAS)
+        targets = [(alias, _sqlite_path(alias)) for alias in aliases]
+
+        try:
+            while True:
+                started = time.perf_counter()
+                with closing(sqlite3.connect(source_path)) as source:
+                    for alias, path in targets:
+                        with closing(sqlite3.connect(path)) as target:
+                            source.backup(target)
+                self.stdout.write(
+                    f'Copied the primary to {", ".join(alias for alias, _ in targets)} '
+                    f'in {time.perf_counter() - started:.2f}s.'
+                )
+                if not options['every']:
+                    break
+                time.sleep(options['every'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbers', '0001_initial'),
+        ('appointments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bookings', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('barber_shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='barbers.barbershop')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily occupancy',
+                'unique_together': {('barber_shop', 'date')},
+            },
+        ),
+    ]
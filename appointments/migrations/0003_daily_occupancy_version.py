@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0002_daily_occupancy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyoccupancy',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
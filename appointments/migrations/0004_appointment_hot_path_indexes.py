@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_daily_occupancy_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['barber_shop', 'date', 'start_time'], name='appt_shop_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('status__in', ['PENDING', 'ACCEPTED'])), fields=['barber_shop', 'date', 'start_time'], name='appt_shop_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['customer', 'date', 'start_time'], name='appt_customer_date_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_profile_avatar_variants'),
+        ('barbers', '0006_barbershop_image_variants'),
+        ('appointments', '0004_appointment_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAppointment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('ACCEPTED', 'Accepted'), ('REJECTED', 'Rejected'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled')], max_length=10)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('barber_shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to='barbers.barbershop')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments_as_customer', to='authentication.profile')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to='barbers.service')),
+            ],
+            options={
+                'ordering': ['-date', '-start_time'],
+                'indexes': [models.Index(fields=['barber_shop', 'date', 'start_time'], name='archive_shop_date_idx'), models.Index(fields=['customer', 'date', 'start_time'], name='archive_customer_date_idx')],
+            },
+        ),
+    ]
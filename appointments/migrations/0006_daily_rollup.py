@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbers', '0006_barbershop_image_variants'),
+        ('appointments', '0005_archived_appointment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('pending', models.IntegerField(default=0)),
+                ('accepted', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('cancelled', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('booked_minutes', models.IntegerField(default=0)),
+                ('open_minutes', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('barber_shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='barbers.barbershop')),
+            ],
+            options={
+                'unique_together': {('barber_shop', 'date')},
+            },
+        ),
+    ]
@@ -1,5 +1,5 @@
 """
-Appointment models - Booking, status management
+Appointment models - Booking, status management, archive of old bookings, occupancy index, analytics rollups
 """
 from django.db import models
 from django.utils import timezone
@@ -45,6 +45,20 @@ class Appointment(models.Model):
 
     class Meta:
         ordering = ['-date', '-start_time']
+        indexes = [
+            # Barber dashboard / appointment lists: shop -> date order.
+            models.Index(fields=['barber_shop', 'date', 'start_time'], name='appt_shop_date_idx'),
+            # Slot engine and occupancy rebuilds only read active bookings. SQLite
+            # can't match a partial index against bound parameters and uses the
+            # index above; PostgreSQL (psycopg2 inlines parameters) uses this one.
+            models.Index(
+                fields=['barber_shop', 'date', 'start_time'],
+                condition=models.Q(status__in=['PENDING', 'ACCEPTED']),
+                name='appt_shop_active_idx',
+            ),
+            # Customer appointment history.
+            models.Index(fields=['customer', 'date', 'start_time'], name='appt_customer_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.customer} - {self.barber_shop} - {self.date} {self.start_time} ({self.status})"
@@ -57,3 +71,109 @@ class Appointment(models.Model):
         dt = tz.datetime.combine(self.date, self.start_time)
         dt += timedelta(minutes=self.service.duration_minutes)
         return dt.time()
+
+
+class ArchivedAppointment(models.Model):
+    """
+    A finished appointment moved out of the hot Appointment table by
+    `manage.py archive_appointments`. Keeps the id and columns it had, so
+    history lists can merge both tables in one keyset order. Read-only.
+    """
+    Status = Appointment.Status
+    # Finished states are terminal, so archived rows never change again.
+    ARCHIVABLE_STATUSES = (Status.COMPLETED, Status.REJECTED, Status.CANCELLED)
+
+    id = models.BigIntegerField(primary_key=True)
+    customer = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        related_name='archived_appointments_as_customer'
+    )
+    barber_shop = models.ForeignKey(
+        BarberShop,
+        on_delete=models.CASCADE,
+        related_name='archived_appointments'
+    )
+    service = models.ForeignKey(
+        Service,
+        on_delete=models.CASCADE,
+        related_name='archived_appointments'
+    )
+    date = models.DateField()
+    start_time = models.TimeField()
+    status = models.CharField(max_length=10, choices=Status.choices)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-date', '-start_time']
+        indexes = [
+            # History lists, same shape as the hot table's.
+            models.Index(fields=['barber_shop', 'date', 'start_time'], name='archive_shop_date_idx'),
+            models.Index(fields=['customer', 'date', 'start_time'], name='archive_customer_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.customer} - {self.barber_shop} - {self.date} {self.start_time} ({self.status}, archived)"
+
+    end_time = Appointment.end_time
+
+
+class DailyOccupancy(models.Model):
+    """
+    Occupancy index for one shop on one date, kept in step with Appointment
+    writes (see appointments.occupancy) so availability reads need no
+    appointment scan. `bookings` is a sorted list of
+    [start_minute, end_minute, appointment_id] for active bookings.
+    """
+    barber_shop = models.ForeignKey(
+        BarberShop,
+        on_delete=models.CASCADE,
+        related_name='occupancy'
+    )
+    date = models.DateField()
+    bookings = models.JSONField(default=list)
+    # Bumped by every booking before it validates, which takes the row's
+    # write lock and serialises bookings for the same shop and date.
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [['barber_shop', 'date']]
+        verbose_name_plural = 'Daily occupancy'
+
+    def __str__(self):
+        return f"{self.barber_shop} - {self.date} ({len(self.bookings)} booking(s))"
+
+
+class DailyRollup(models.Model):
+    """
+    Analytics for one shop on one date, kept in step with Appointment writes
+    (see appointments.rollups) so analytics pages read no appointments.
+    One count per status; `revenue` sums the service prices of completed
+    appointments, `booked_minutes` the service minutes of accepted and
+    completed ones, and `open_minutes` is the shop's working hours that day.
+    """
+    barber_shop = models.ForeignKey(
+        BarberShop,
+        on_delete=models.CASCADE,
+        related_name='daily_rollups'
+    )
+    date = models.DateField()
+    pending = models.IntegerField(default=0)
+    accepted = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    cancelled = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    booked_minutes = models.IntegerField(default=0)
+    open_minutes = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [['barber_shop', 'date']]
+
+    def __str__(self):
+        return f"{self.barber_shop} - {self.date} ({self.completed} completed)"
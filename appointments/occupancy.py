@@ -0,0 +1,203 @@
+"""
+Occupancy index - per-shop, per-date booked intervals maintained on write
+
+Appointment saves/deletes update the DailyOccupancy row for the affected
+(shop, date) in place (see appointments.signals), creating it from the
+Appointment table if it is missing. Reads build the dates they find
+missing from the table, for exactly those dates, so the index never
+needs a full backfill to be correct. Built dates inside the booking
+window are stored, days without bookings included, so calendars stop
+going back to the table; those builds read the primary database, since
+a row stored from a lagging replica would stay wrong. Dates outside the
+window are only computed. Bulk writes that bypass signals
+(QuerySet.update, bulk_create) must call refresh() themselves.
+"""
+from contextlib import nullcontext
+from datetime import date, timedelta
+
+from django.db import IntegrityError, transaction
+
+from trimtrove.replicas import use_primary
+from .models import Appointment, DailyOccupancy
+from .utils import ACTIVE_STATUSES, BOOKING_WINDOW_DAYS, to_minutes, merge_intervals
+
+
+def active_bookings(shop_id, dates):
+    """Active bookings of a shop on some dates - the query behind every index build."""
+    return Appointment.objects.filter(
+        barber_shop_id=shop_id,
+        date__in=dates,
+        status__in=ACTIVE_STATUSES
+    ).values_list('id', 'date', 'start_time', 'service__duration_minutes')
+
+
+def _group_entries(rows):
+    by_date = {}
+    for pk, day, start, duration in rows:
+        begin = to_minutes(start)
+        by_date.setdefault(day, []).append([begin, begin + duration, pk])
+    for entries in by_date.values():
+        entries.sort()
+    return by_date
+
+
+def entries_from_table(shop_id, dates):
+    """Build {date: sorted [start, end, appointment_id]} for some dates from the Appointment table."""
+    return _group_entries(active_bookings(shop_id, dates))
+
+
+def intervals(entries):
+    """Merged (start, end) intervals for a list of index entries."""
+    return merge_intervals((start, end) for start, end, _ in entries)
+
+
+def _missing_dates(found, start_date, end_date):
+    missing = []
+    day = start_date
+    while day <= end_date:
+        if day not in found:
+            missing.append(day)
+        day += timedelta(days=1)
+    return missing
+
+
+def _worth_storing(missing):
+    # Dates customers can book; anything else is read too rarely to keep.
+    first = date.today()
+    last = first + timedelta(days=BOOKING_WINDOW_DAYS)
+    return [day for day in missing if first <= day <= last]
+
+
+def _fill_missing(shop_id, found, missing, built, store):
+    """Add freshly built entries to `found`; return the rows to persist."""
+    for day in missing:
+        found[day] = built.get(day, [])
+    return [DailyOccupancy(barber_shop_id=shop_id, date=day, bookings=found[day]) for day in store]
+
+
+def _indexed_rows(shop_id, start_date, end_date):
+    return DailyOccupancy.objects.filter(barber_shop_id=shop_id, date__range=(start_date, end_date))
+
+
+def get_occupancy_range(shop_id, start_date, end_date):
+    """
+    Index entries for every date in a range (inclusive): {date: entries}.
+    Reads the index in one query; dates not yet indexed are built with a
+    single appointment query, and stored if inside the booking window.
+    """
+    found = {row.date: row.bookings for row in _indexed_rows(shop_id, start_date, end_date)}
+    missing = _missing_dates(found, start_date, end_date)
+    if missing:
+        store = _worth_storing(missing)
+        with use_primary() if store else nullcontext():
+            rows = _fill_missing(shop_id, found, missing, entries_from_table(shop_id, missing), store)
+            # A concurrent reader may have built the same rows; either copy is correct.
+            DailyOccupancy.objects.bulk_create(rows, ignore_conflicts=True)
+    return found
+
+
+async def aget_occupancy_range(shop_id, start_date, end_date):
+    """Async (ASGI) counterpart of get_occupancy_range."""
+    found = {row.date: row.bookings async for row in _indexed_rows(shop_id, start_date, end_date)}
+    missing = _missing_dates(found, start_date, end_date)
+    if missing:
+        store = _worth_storing(missing)
+        with use_primary() if store else nullcontext():
+            built = _group_entries([row async for row in active_bookings(shop_id, missing)])
+            rows = _fill_missing(shop_id, found, missing, built, store)
+            await DailyOccupancy.objects.abulk_create(rows, ignore_conflicts=True)
+    return found
+
+
+def get_occupancy(shop_id, day):
+    """Index entries for one shop on one date."""
+    return get_occupancy_range(shop_id, day, day)[day]
+
+
+async def aget_occupancy(shop_id, day):
+    """Async (ASGI) counterpart of get_occupancy."""
+    return (await aget_occupancy_range(shop_id, day, day))[day]
+
+
+def _locked_row(shop_id, day):
+    """Fetch (or build) the index row for update. Call inside a transaction."""
+    row = DailyOccupancy.objects.select_for_update().filter(barber_shop_id=shop_id, date=day).first()
+    if row is not None:
+        return row
+    try:
+        with transaction.atomic():
+            return DailyOccupancy.objects.create(
+                barber_shop_id=shop_id, date=day,
+                bookings=entries_from_table(shop_id, [day]).get(day, [])
+            )
+    except IntegrityError:
+        return DailyOccupancy.objects.select_for_update().get(barber_shop_id=shop_id, date=day)
+
+
+def locked_entries(shop_id, day):
+    """Index entries of (shop, date), with its row locked (built if missing). Call inside a transaction."""
+    return _locked_row(shop_id, day).bookings
+
+
+def _discard(shop_id, day, appointment_id):
+    # A missing row is built from the table on next read, which already
+    # lacks the appointment, so there is nothing to create here.
+    row = DailyOccupancy.objects.select_for_update().filter(barber_shop_id=shop_id, date=day).first()
+    if row is None:
+        return
+    kept = [entry for entry in row.bookings if entry[2] != appointment_id]
+    if len(kept) != len(row.bookings):
+        row.bookings = kept
+        row.save(update_fields=['bookings', 'updated_at'])
+
+
+def apply_appointment(appointment, previous=None):
+    """
+    Bring the index in line with one appointment's current state.
+    `previous` is the (barber_shop_id, date) it occupied before this write,
+    if different. Idempotent: re-applying the same state is a no-op.
+    """
+    with transaction.atomic():
+        key = (appointment.barber_shop_id, appointment.date)
+        if previous and previous != key:
+            _discard(previous[0], previous[1], appointment.pk)
+        row = _locked_row(*key)
+        entries = [entry for entry in row.bookings if entry[2] != appointment.pk]
+        if appointment.status in ACTIVE_STATUSES:
+            begin = to_minutes(appointment.start_time)
+            entries.append([begin, begin + appointment.service.duration_minutes, appointment.pk])
+            entries.sort()
+        if entries != row.bookings:
+            row.bookings = entries
+            row.save(update_fields=['bookings', 'updated_at'])
+
+
+def remove_appointment(appointment):
+    """Drop a deleted appointment from the index."""
+    with transaction.atomic():
+        _discard(appointment.barber_shop_id, appointment.date, appointment.pk)
+
+
+def refresh(shop_id, dates):
+    """Rebuild the index rows for some dates of a shop from the Appointment table."""
+    dates = sorted(set(dates))
+    if not dates:
+        return
+    built = entries_from_table(shop_id, dates)
+    with transaction.atomic():
+        for day in dates:
+            DailyOccupancy.objects.update_or_create(
+                barber_shop_id=shop_id, date=day, defaults={'bookings': built.get(day, [])}
+            )
+
+
+def invalidate_shop(shop_id):
+    """Forget every indexed date of a shop; rows are rebuilt lazily on next read."""
+    DailyOccupancy.objects.filter(barber_shop_id=shop_id).delete()
+
+
+def overlaps(entries, start_time, duration_minutes, exclude_id=None):
+    """Whether [start_time, start_time + duration) overlaps any of the index entries."""
+    begin = to_minutes(start_time)
+    end = begin + duration_minutes
+    return any(start < end and begin < stop for start, stop, pk in entries if pk != exclude_id)
@@ -0,0 +1,117 @@
+"""
+Appointment list pagination - keyset (cursor) paging on (date, start_time, id)
+
+Lists are newest first. A cursor is the sort key of the last row shown,
+so every page is an index range scan starting where the previous page
+stopped; cost does not grow with how far back the history goes. History
+lists pass the matching ArchivedAppointment queryset too: archived rows
+keep their ids, so a page is the merge of one range scan per table.
+Lists spanning several shops (a barber's) pass shop_ids and get one scan
+per shop and table on the (barber_shop, date, start_time) indexes; a
+single query across shops would have to sort the whole history.
+"""
+from datetime import date, time
+
+from django.db.models import Q
+from django.http import HttpResponseBadRequest
+from django.shortcuts import render
+
+from .models import Appointment
+
+PAGE_SIZE = 50
+ORDERING = ('-date', '-start_time', '-id')
+
+
+def encode_cursor(appointment):
+    return f'{appointment.date.isoformat()}_{appointment.start_time.strftime("%H:%M:%S")}_{appointment.pk}'
+
+
+def decode_cursor(cursor):
+    """(date, start_time, id) from a cursor string; raises ValueError."""
+    day, start, pk = cursor.split('_')
+    return date.fromisoformat(day), time.fromisoformat(start), int(pk)
+
+
+def filter_appointments(queryset, params):
+    """
+    Apply the list filters from a QueryDict: date_from, date_to (YYYY-MM-DD)
+    and status. Invalid values are ignored.
+    """
+    for param, lookup in (('date_from', 'date__gte'), ('date_to', 'date__lte')):
+        try:
+            queryset = queryset.filter(**{lookup: date.fromisoformat(params.get(param, ''))})
+        except ValueError:
+            pass
+    status = params.get('status')
+    if status in Appointment.Status.values:
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+def after_cursor(queryset, cursor=None):
+    """`queryset` in list order, starting after `cursor`. Raises ValueError on a bad cursor."""
+    queryset = queryset.order_by(*ORDERING)
+    if cursor:
+        day, start, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(date__lt=day)
+            | Q(date=day, start_time__lt=start)
+            | Q(date=day, start_time=start, id__lt=pk)
+        )
+    return queryset
+
+
+def _sort_key(appointment):
+    return appointment.date, appointment.start_time, appointment.pk
+
+
+def keyset_page(queryset, cursor=None, page_size=PAGE_SIZE, archive=None, shop_ids=None):
+    """
+    One page of `queryset` (merged with the `archive` queryset, if given)
+    after `cursor`; with `shop_ids`, merged from one scan per shop.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Raises ValueError on a bad cursor.
+    """
+    sources = [queryset] if archive is None else [queryset, archive]
+    if shop_ids is not None:
+        sources = [source.filter(barber_shop_id=shop_id) for source in sources for shop_id in shop_ids]
+    rows = []
+    for source in sources:
+        rows += after_cursor(source, cursor)[:page_size + 1]
+    if len(sources) > 1:
+        rows.sort(key=_sort_key, reverse=True)
+    if len(rows) > page_size:
+        return rows[:page_size], encode_cursor(rows[page_size - 1])
+    return rows, None
+
+
+def render_keyset_page(request, template, rows_template, queryset, context=None, archive=None, shop_ids=None):
+    """
+    Render one page of appointments (and archived ones, per shop; see keyset_page).
+    With ?fragment=1 only the table rows are returned (for infinite scroll)
+    and the next cursor travels in the X-Next-Cursor header; otherwise the
+    full page is rendered.
+    """
+    if archive is not None:
+        archive = filter_appointments(archive, request.GET)
+    try:
+        rows, next_cursor = keyset_page(
+            filter_appointments(queryset, request.GET), request.GET.get('cursor'),
+            archive=archive, shop_ids=shop_ids,
+        )
+    except ValueError:
+        return HttpResponseBadRequest('Invalid cursor')
+
+    if request.GET.get('fragment'):
+        response = render(request, rows_template, {'appointments': rows})
+        if next_cursor:
+            response['X-Next-Cursor'] = next_cursor
+        return response
+
+    return render(request, template, {
+        'appointments': rows,
+        'next_cursor': next_cursor,
+        'filters': request.GET,
+        'status_choices': Appointment.Status.choices,
+        **(context or {}),
+    })
@@ -0,0 +1,171 @@
+"""
+Daily rollups - per-shop, per-date booking counts, revenue and utilization
+
+Each appointment contributes to the DailyRollup row of its (shop, date):
+one count under its status, its service price once completed and its
+service minutes while accepted or completed. Writes move that
+contribution with F() deltas (signals for saves and deletes,
+bulk_transition for its UPDATE), so a save that changes neither status
+nor date writes nothing. A row that a save needs but that does not exist
+yet is built from the appointment tables (hot and archived), which
+already hold the write; deletes only adjust rows that exist. `manage.py
+backfill_rollups` writes a row for every shop and day, days without
+bookings included, and can rebuild rows from the tables.
+
+Revenue and booked minutes use the service price and duration at the
+time of each write, so after a service edit they no longer match what
+the tables would give today; rebuilt rows price the past at today's
+prices. open_minutes is taken from WorkingHours when a row is built;
+working-hours edits update the rows from today on. Drift checks
+therefore compare only the status counts (CHECKED_FIELDS). No-shows are
+not stored: they are ACCEPTED appointments on past dates.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from barbers.models import WorkingHours
+from .models import Appointment, ArchivedAppointment, DailyRollup
+from .utils import to_minutes
+
+Status = Appointment.Status
+# Statuses whose minutes count as booked chair time.
+BOOKED_STATUSES = (Status.ACCEPTED, Status.COMPLETED)
+COUNT_FIELDS = {status: status.lower() for status in Status.values}
+FIELDS = (*COUNT_FIELDS.values(), 'revenue', 'booked_minutes', 'open_minutes')
+# Fields the tables can reproduce; the rest are snapshots taken at write time.
+CHECKED_FIELDS = tuple(COUNT_FIELDS.values())
+
+
+def empty():
+    return {**dict.fromkeys(FIELDS, 0), 'revenue': Decimal('0.00')}
+
+
+def contribution(status, price, minutes, count=1):
+    """What `count` appointments in `status` (prices and minutes summed) add to their day's row."""
+    values = {COUNT_FIELDS[status]: count}
+    if status == Status.COMPLETED:
+        values['revenue'] = price
+    if status in BOOKED_STATUSES:
+        values['booked_minutes'] = minutes
+    return values
+
+
+def entry(appointment):
+    """(shop_id, date, status, price, minutes) of an appointment or archived appointment."""
+    service = appointment.service
+    return (appointment.barber_shop_id, appointment.date, appointment.status,
+            service.price, service.duration_minutes)
+
+
+def open_minutes(shop_ids):
+    """{shop_id: {day_of_week: minutes open}}; days without working hours are closed."""
+    hours = {shop_id: {} for shop_id in shop_ids}
+    for shop_id, day, start, end, closed in WorkingHours.objects.filter(barber_shop_id__in=shop_ids).values_list(
+        'barber_shop_id', 'day_of_week', 'start_time', 'end_time', 'is_closed'
+    ):
+        hours[shop_id][day] = 0 if closed else max(to_minutes(end) - to_minutes(start), 0)
+    return hours
+
+
+def compute(shop_ids, start_date, end_date):
+    """{(shop_id, date): {field: value}} for every shop and date in a range, from the source tables."""
+    hours = open_minutes(shop_ids)
+    rows = {}
+    day = start_date
+    while day <= end_date:
+        for shop_id in shop_ids:
+            rows[(shop_id, day)] = {**empty(), 'open_minutes': hours[shop_id].get(day.weekday(), 0)}
+        day += timedelta(days=1)
+    for model in (Appointment, ArchivedAppointment):
+        grouped = model.objects.filter(
+            barber_shop_id__in=shop_ids, date__range=(start_date, end_date)
+        ).values('barber_shop_id', 'date', 'status').annotate(
+            count=Count('id'), price=Sum('service__price'), minutes=Sum('service__duration_minutes')
+        )
+        for row in grouped:
+            values = rows[(row['barber_shop_id'], row['date'])]
+            for field, amount in contribution(row['status'], row['price'], row['minutes'], row['count']).items():
+                values[field] += amount
+    return rows
+
+
+def _add(deltas, key, values, sign):
+    changes = deltas.setdefault(key, {})
+    for field, amount in values.items():
+        changes[field] = changes.get(field, 0) + sign * amount
+
+
+def _update(shop_id, day, changes, now):
+    return DailyRollup.objects.filter(barber_shop_id=shop_id, date=day).update(
+        updated_at=now, **{field: F(field) + amount for field, amount in changes.items()}
+    )
+
+
+def _build(shop_id, day, changes, now):
+    try:
+        with transaction.atomic():
+            DailyRollup.objects.create(barber_shop_id=shop_id, date=day, **compute([shop_id], day, day)[(shop_id, day)])
+    except IntegrityError:
+        # Built meanwhile by a transaction that could not see this write.
+        _update(shop_id, day, changes, now)
+
+
+def record(changes, build_missing=True):
+    """
+    Apply appointment writes to the rollups. `changes` holds (before, after)
+    pairs of entry() tuples; before is None for a new appointment, after
+    None for a deleted one. Rows are locked in (shop, date) order.
+    """
+    deltas = {}
+    for before, after in changes:
+        if before:
+            _add(deltas, before[:2], contribution(*before[2:]), -1)
+        if after:
+            _add(deltas, after[:2], contribution(*after[2:]), 1)
+    now = timezone.now()
+    with transaction.atomic():
+        for (shop_id, day), changes in sorted(deltas.items()):
+            changes = {field: amount for field, amount in changes.items() if amount}
+            if changes and not _update(shop_id, day, changes, now) and build_missing:
+                _build(shop_id, day, changes, now)
+
+
+def refresh_open_minutes(shop_id, day_of_week):
+    """Copy a shop's current hours for one weekday into its rows from today on."""
+    minutes = open_minutes([shop_id])[shop_id].get(day_of_week, 0)
+    DailyRollup.objects.filter(
+        barber_shop_id=shop_id, date__gte=date.today(), date__iso_week_day=day_of_week + 1
+    ).update(open_minutes=minutes, updated_at=timezone.now())
+
+
+def _totals():
+    # Aliases must not shadow the fields the no-shows sum reads.
+    return {
+        **{f'sum_{field}': Sum(field) for field in FIELDS},
+        'sum_no_shows': Sum('accepted', filter=Q(date__lt=date.today())),
+    }
+
+
+def _derive(values):
+    values = {key.removeprefix('sum_'): value or 0 for key, value in values.items()}
+    values['bookings'] = sum(values[field] for field in COUNT_FIELDS.values())
+    values['utilization'] = (
+        round(100 * values['booked_minutes'] / values['open_minutes'], 1) if values['open_minutes'] else None
+    )
+    return values
+
+
+def summarize(rollups):
+    """Totals of a DailyRollup queryset plus bookings, no-shows and utilization (% of open minutes)."""
+    return _derive(rollups.aggregate(**_totals()))
+
+
+def by_period(rollups, period='day'):
+    """summarize() per day or per month, in date order; periods without rows are left out."""
+    key = TruncMonth('date') if period == 'month' else F('date')
+    return [_derive(row) for row in rollups.values(period=key).annotate(**_totals()).order_by('period')]
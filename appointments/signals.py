@@ -0,0 +1,146 @@
+"""
+Appointment signals - keep the occupancy index, slot cache, shop stats and daily rollups in step
+with bookings, queue the background side effects of status changes
+"""
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from barbers import stats
+from barbers.models import BarberShop, Service, WorkingHours
+from . import occupancy, rollups, slot_cache, tasks
+from .models import Appointment, ArchivedAppointment
+from .utils import ACTIVE_STATUSES
+
+
+@receiver(pre_save, sender=Appointment)
+def remember_previous_slot(sender, instance, raw=False, **kwargs):
+    """Stash the (shop, date), status and service an existing appointment had before this save."""
+    instance._previous_slot = instance._previous_status = instance._previous_service = None
+    if not instance._state.adding and not raw:
+        previous = Appointment.objects.filter(pk=instance.pk).values_list(
+            'barber_shop_id', 'date', 'status', 'service_id', 'service__price', 'service__duration_minutes'
+        ).first()
+        if previous:
+            instance._previous_slot, instance._previous_status = previous[:2], previous[2]
+            instance._previous_service = previous[3:]
+
+
+@receiver(post_save, sender=Appointment)
+def index_appointment(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    occupancy.apply_appointment(instance, previous=getattr(instance, '_previous_slot', None))
+
+
+@receiver(post_delete, sender=Appointment)
+def unindex_appointment(sender, instance, **kwargs):
+    occupancy.remove_appointment(instance)
+
+
+@receiver(pre_save, sender=Service)
+def remember_previous_duration(sender, instance, raw=False, **kwargs):
+    instance._previous_duration = None
+    if not instance._state.adding and not raw:
+        instance._previous_duration = Service.objects.filter(pk=instance.pk).values_list(
+            'duration_minutes', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Service)
+def reindex_on_duration_change(sender, instance, created=False, raw=False, **kwargs):
+    """Booked intervals are derived from service durations; drop the shop's index when one changes."""
+    previous = getattr(instance, '_previous_duration', None)
+    if not created and not raw and previous is not None and previous != instance.duration_minutes:
+        occupancy.invalidate_shop(instance.barber_shop_id)
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def expire_cached_slots(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    dates = {(instance.barber_shop_id, instance.date)}
+    previous = getattr(instance, '_previous_slot', None)
+    if previous:
+        dates.add(previous)
+
+    def bump():
+        for shop_id, day in dates:
+            slot_cache.bump_date(shop_id, day)
+    # Bump after commit so a concurrent reader cannot re-cache pre-commit data.
+    transaction.on_commit(bump)
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+def expire_shop_slots(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    shop_id = instance.barber_shop_id
+    transaction.on_commit(lambda: slot_cache.bump_shop(shop_id))
+
+
+@receiver(post_save, sender=Appointment)
+def count_completion(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    completed = Appointment.Status.COMPLETED
+    previous = getattr(instance, '_previous_slot', None)
+    # The shop credited with this completion before and after the save (None if not completed).
+    before = previous[0] if previous and instance._previous_status == completed else None
+    after = instance.barber_shop_id if instance.status == completed else None
+    if before != after:
+        if before:
+            stats.add_completed(before, -1)
+        if after:
+            stats.add_completed(after)
+
+
+@receiver(post_delete, sender=Appointment)
+@receiver(post_delete, sender=ArchivedAppointment)
+def uncount_completion(sender, instance, origin=None, **kwargs):
+    if instance.status == Appointment.Status.COMPLETED and not isinstance(origin, BarberShop):
+        stats.add_completed(instance.barber_shop_id, -1)
+
+
+@receiver(post_save, sender=Appointment)
+def roll_up_appointment(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_slot', None)
+    service = getattr(instance, '_previous_service', None)
+    if service and service[0] == instance.service_id:
+        after = (instance.barber_shop_id, instance.date, instance.status, *service[1:])
+    else:
+        after = rollups.entry(instance)
+    before = (*previous, instance._previous_status, *service[1:]) if previous else None
+    rollups.record([(before, after)])
+
+
+@receiver(post_delete, sender=Appointment)
+@receiver(post_delete, sender=ArchivedAppointment)
+def unroll_appointment(sender, instance, origin=None, **kwargs):
+    # A shop's own rollups are deleted with it.
+    if not isinstance(origin, BarberShop):
+        rollups.record([(rollups.entry(instance), None)], build_missing=False)
+
+
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+def refresh_rollup_hours(sender, instance, raw=False, origin=None, **kwargs):
+    if not raw and not isinstance(origin, BarberShop):
+        rollups.refresh_open_minutes(instance.barber_shop_id, instance.day_of_week)
+
+
+@receiver(post_save, sender=Appointment)
+def queue_status_side_effects(sender, instance, raw=False, **kwargs):
+    """Notify the other party and, when a chair freed up, re-warm that day's slots."""
+    previous = getattr(instance, '_previous_status', None)
+    if raw or previous is None or previous == instance.status:
+        return
+    tasks.notify_status_change.enqueue(appointment_id=instance.pk, status=instance.status)
+    if previous in ACTIVE_STATUSES and instance.status not in ACTIVE_STATUSES:
+        tasks.warm_slots.enqueue(shop_id=instance.barber_shop_id, day=instance.date.isoformat())
@@ -0,0 +1,119 @@
+"""
+Slot cache - versioned cache in front of get_available_slots
+
+Entries are keyed on (shop, service, date) plus two version tokens: one
+per shop (bumped by Service/WorkingHours changes) and one per shop per
+date (bumped by Appointment changes). Bumping a version orphans the old
+entries, which then expire on their own. Cached slot lists include slots
+that already started today; the "no past slots" rule is applied on read.
+Misses are computed from the primary database: an entry built from a
+lagging replica after a version bump would stay stale until it expires.
+"""
+import uuid
+
+from django.core.cache import cache
+
+from trimtrove.replicas import use_primary
+from .utils import get_available_slots, aget_available_slots, drop_past_slots
+
+SLOT_CACHE_TIMEOUT = 60 * 10
+HITS_KEY = 'slots:stats:hits'
+MISSES_KEY = 'slots:stats:misses'
+
+
+def _shop_version_key(shop_id):
+    return f'slots:ver:{shop_id}'
+
+
+def _date_version_key(shop_id, target_date):
+    return f'slots:ver:{shop_id}:{target_date.isoformat()}'
+
+
+def _new_version():
+    # Random tokens rather than counters: if a version key is evicted, a
+    # fresh token can never collide with entries cached under the old one.
+    return uuid.uuid4().hex[:12]
+
+
+def bump_shop(shop_id):
+    """Invalidate every cached slot list of a shop."""
+    cache.set(_shop_version_key(shop_id), _new_version(), None)
+
+
+def bump_date(shop_id, target_date):
+    """Invalidate the cached slot lists of a shop on one date."""
+    cache.set(_date_version_key(shop_id, target_date), _new_version(), None)
+
+
+def _count(key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); losing one sample is fine.
+        pass
+
+
+async def _acount(key):
+    await cache.aadd(key, 0, None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        pass
+
+
+def _entry_key(barber_shop, service, target_date, shop_version, date_version):
+    return f'slots:{barber_shop.pk}:{service.pk}:{target_date.isoformat()}:{shop_version}:{date_version}'
+
+
+def get_cached_slots(barber_shop, service, target_date):
+    """Cached equivalent of get_available_slots(barber_shop, service, target_date)."""
+    shop_key = _shop_version_key(barber_shop.pk)
+    date_key = _date_version_key(barber_shop.pk, target_date)
+    versions = cache.get_many([shop_key, date_key])
+    shop_version = versions.get(shop_key) or cache.get_or_set(shop_key, _new_version(), None)
+    date_version = versions.get(date_key) or cache.get_or_set(date_key, _new_version(), None)
+    key = _entry_key(barber_shop, service, target_date, shop_version, date_version)
+
+    slots = cache.get(key)
+    if slots is None:
+        _count(MISSES_KEY)
+        with use_primary():
+            slots = get_available_slots(barber_shop, service, target_date, include_past=True)
+        cache.set(key, slots, SLOT_CACHE_TIMEOUT)
+    else:
+        _count(HITS_KEY)
+    return drop_past_slots(slots, target_date)
+
+
+async def aget_cached_slots(barber_shop, service, target_date):
+    """Async (ASGI) counterpart of get_cached_slots."""
+    shop_key = _shop_version_key(barber_shop.pk)
+    date_key = _date_version_key(barber_shop.pk, target_date)
+    versions = await cache.aget_many([shop_key, date_key])
+    shop_version = versions.get(shop_key) or await cache.aget_or_set(shop_key, _new_version(), None)
+    date_version = versions.get(date_key) or await cache.aget_or_set(date_key, _new_version(), None)
+    key = _entry_key(barber_shop, service, target_date, shop_version, date_version)
+
+    slots = await cache.aget(key)
+    if slots is None:
+        await _acount(MISSES_KEY)
+        with use_primary():
+            slots = await aget_available_slots(barber_shop, service, target_date, include_past=True)
+        await cache.aset(key, slots, SLOT_CACHE_TIMEOUT)
+    else:
+        await _acount(HITS_KEY)
+    return drop_past_slots(slots, target_date)
+
+
+def get_stats():
+    """Hit/miss counters since the cache was last cleared."""
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counts.get(HITS_KEY, 0)
+    misses = counts.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
@@ -0,0 +1,58 @@
+"""
+Appointment tasks - side effects of status changes, run by `manage.py run_tasks`
+
+Both are enqueued by appointments.signals and bulk_transition in the same
+transaction as the status change, so views return without waiting on mail
+or slot computation.
+"""
+from datetime import date
+
+from django.core.mail import send_mail
+
+from barbers.models import BarberShop
+from taskqueue.queue import task
+from . import slot_cache
+from .models import Appointment
+
+SUBJECTS = {
+    Appointment.Status.ACCEPTED: 'Your appointment at {shop} is confirmed',
+    Appointment.Status.REJECTED: 'Your appointment request at {shop} was declined',
+    Appointment.Status.COMPLETED: 'Thanks for visiting {shop}',
+    Appointment.Status.CANCELLED: 'Appointment at {shop} cancelled by the customer',
+}
+
+
+@task
+def notify_status_change(appointment_id, status):
+    """Email the customer about the barber's decision, or the barber about a cancellation."""
+    appointment = Appointment.objects.select_related(
+        'customer__user', 'barber_shop__created_by__user', 'service'
+    ).filter(pk=appointment_id).first()
+    # Gone, or changed again since; the newer change queued its own notice.
+    if appointment is None or appointment.status != status or status not in SUBJECTS:
+        return
+    shop = appointment.barber_shop
+    if status == Appointment.Status.CANCELLED:
+        recipient = shop.created_by.user
+    else:
+        recipient = appointment.customer.user
+    if not recipient.email:
+        return
+    send_mail(
+        SUBJECTS[status].format(shop=shop.name),
+        f'{appointment.service.name} on {appointment.date:%a %d %b %Y} at {appointment.start_time:%H:%M} '
+        f'at {shop.name}, {shop.address}: {appointment.get_status_display().lower()}.',
+        None,
+        [recipient.email],
+    )
+
+
+@task
+def warm_slots(shop_id, day):
+    """Recompute the cached slot lists of every service of a shop on `day` (ISO date) after slots freed up."""
+    day = date.fromisoformat(day)
+    shop = BarberShop.objects.filter(pk=shop_id).first()
+    if shop is None or day < date.today():
+        return
+    for service in shop.services.all():
+        slot_cache.get_cached_slots(shop, service, day)
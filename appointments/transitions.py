@@ -0,0 +1,88 @@
+"""
+Appointment status transitions - bulk updates for barbers
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from barbers import stats
+from taskqueue import queue
+from . import occupancy, rollups, slot_cache, tasks
+from .models import Appointment
+from .utils import ACTIVE_STATUSES
+
+# Target status -> the only status it may be reached from.
+ALLOWED_FROM = {
+    Appointment.Status.ACCEPTED: Appointment.Status.PENDING,
+    Appointment.Status.REJECTED: Appointment.Status.PENDING,
+    Appointment.Status.COMPLETED: Appointment.Status.ACCEPTED,
+}
+MAX_BULK_IDS = 500
+
+
+def bulk_transition(profile, ids, target):
+    """
+    Move the barber's appointments `ids` to `target` in one conditional UPDATE.
+    Only `status` and `updated_at` are written. Returns {id: outcome} where
+    outcome is 'updated', 'not_found' (missing or not this barber's) or
+    'invalid_state'. QuerySet.update() skips model signals, so the occupancy
+    index, slot cache, shop stats and daily rollups are refreshed here for the
+    touched shop/dates, and the tasks appointments.signals would queue are queued here.
+    """
+    from_status = ALLOWED_FROM[target]
+    with transaction.atomic():
+        owned = {
+            pk: (status, shop_id, day, price, minutes)
+            for pk, status, shop_id, day, price, minutes in Appointment.objects.select_for_update(of=('self',)).filter(
+                pk__in=ids, barber_shop__created_by=profile
+            ).values_list('pk', 'status', 'barber_shop_id', 'date', 'service__price', 'service__duration_minutes')
+        }
+        eligible = [pk for pk, (status, *_) in owned.items() if status == from_status]
+        if eligible:
+            Appointment.objects.filter(pk__in=eligible, status=from_status).update(
+                status=target, updated_at=timezone.now()
+            )
+
+        # PENDING -> ACCEPTED keeps the chair occupied; only freeing moves matter.
+        touched = {}
+        if target not in ACTIVE_STATUSES:
+            for pk in eligible:
+                _, shop_id, day, *_ = owned[pk]
+                touched.setdefault(shop_id, set()).add(day)
+        for shop_id, dates in touched.items():
+            occupancy.refresh(shop_id, dates)
+
+        if target == Appointment.Status.COMPLETED:
+            completed = {}
+            for pk in eligible:
+                shop_id = owned[pk][1]
+                completed[shop_id] = completed.get(shop_id, 0) + 1
+            for shop_id, count in completed.items():
+                stats.add_completed(shop_id, count)
+
+        rollups.record(
+            ((shop_id, day, from_status, price, minutes), (shop_id, day, target, price, minutes))
+            for _, shop_id, day, price, minutes in map(owned.get, eligible)
+        )
+
+        queue.enqueue_many(tasks.notify_status_change.task_name, [
+            {'appointment_id': pk, 'status': target} for pk in eligible
+        ])
+        queue.enqueue_many(tasks.warm_slots.task_name, [
+            {'shop_id': shop_id, 'day': day.isoformat()} for shop_id, dates in touched.items() for day in dates
+        ])
+
+        def bump():
+            for shop_id, dates in touched.items():
+                for day in dates:
+                    slot_cache.bump_date(shop_id, day)
+        transaction.on_commit(bump)
+
+    results = {}
+    for pk in ids:
+        if pk not in owned:
+            results[pk] = 'not_found'
+        elif owned[pk][0] == from_status:
+            results[pk] = 'updated'
+        else:
+            results[pk] = 'invalid_state'
+    return results
@@ -6,6 +6,12 @@ app_name = 'appointments'
 
 urlpatterns = [
     path('slots/', views.available_slots, name='available_slots'),
+    path('slots/cache-stats/', views.slot_cache_stats, name='slot_cache_stats'),
+    path('calendar/', views.availability_calendar, name='availability_calendar'),
+    # Async variants for ASGI deployments (see trimtrove/asgi.py)
+    path('async/slots/', views.available_slots_async, name='available_slots_async'),
+    path('async/calendar/', views.availability_calendar_async, name='availability_calendar_async'),
+    path('bulk-status/', views.bulk_status, name='bulk_status'),
     path('<int:pk>/cancel/', views.cancel_appointment, name='cancel'),
     path('<int:pk>/accept/', views.accept_appointment, name='accept'),
     path('<int:pk>/reject/', views.reject_appointment, name='reject'),
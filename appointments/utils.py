@@ -4,49 +4,176 @@ Appointment utilities - Slot generation, availability check
 from datetime import datetime, date, timedelta
 from barbers.models import BarberShop, Service, WorkingHours
 
+# Statuses that occupy the chair; rejected/cancelled/completed free it up.
+ACTIVE_STATUSES = ('PENDING', 'ACCEPTED')
+# Minutes between consecutive candidate slot starts.
+SLOT_STEP_MINUTES = 30
+# How far ahead customers can book.
+BOOKING_WINDOW_DAYS = 30
 
-def get_available_slots(barber_shop, service, target_date):
+
+def to_minutes(t):
+    """Convert a time to minutes since midnight."""
+    return t.hour * 60 + t.minute
+
+
+def from_minutes(minutes):
+    """Convert minutes since midnight back to a time."""
+    return (datetime.min + timedelta(minutes=minutes)).time()
+
+
+def merge_intervals(intervals):
+    """Merge overlapping (start, end) minute intervals into a sorted, disjoint list."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start < merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def get_booked_intervals(barber_shop, target_date):
     """
-    Get available time slots for a barber shop on a given date.
-    Returns list of (start_time, end_time) tuples.
+    Active bookings of a shop on a date, read from the occupancy index.
+    Returns merged (start, end) intervals in minutes since midnight.
     """
-    # Get working hours for this day
+    from appointments import occupancy
+    return occupancy.intervals(occupancy.get_occupancy(barber_shop.pk, target_date))
+
+
+def compute_free_slots(open_start, open_end, duration, booked, not_before=None, step=SLOT_STEP_MINUTES):
+    """
+    Pure in-memory slot search, all values in minutes since midnight.
+    `booked` must be merged intervals (see merge_intervals). A candidate
+    [start, start + duration) is free when it overlaps no booked interval
+    and starts after `not_before`. Returns a list of start minutes.
+    """
+    free = []
+    i = 0
+    current = open_start
+    while current + duration <= open_end:
+        # Booked intervals are disjoint and sorted, so anything ending at or
+        # before this candidate can never block a later one either.
+        while i < len(booked) and booked[i][1] <= current:
+            i += 1
+        overlaps = i < len(booked) and booked[i][0] < current + duration
+        is_past = not_before is not None and current <= not_before
+        if not overlaps and not is_past:
+            free.append(current)
+        current += step
+    return free
+
+
+def drop_past_slots(slots, target_date):
+    """Remove slots that have already started when target_date is today."""
+    if target_date != date.today():
+        return slots
+    now = datetime.now().time()
+    return [slot for slot in slots if slot[0] > now.replace(second=0, microsecond=0)]
+
+
+def slots_for_day(wh, service, booked, target_date, include_past=False):
+    """Free (start_time, end_time) slots of one service, given the day's hours and bookings."""
+    # Don't offer past slots today
+    not_before = None
+    if target_date == date.today() and not include_past:
+        not_before = to_minutes(datetime.now().time())
+
+    duration = service.duration_minutes
+    starts = compute_free_slots(
+        to_minutes(wh.start_time), to_minutes(wh.end_time), duration, booked, not_before
+    )
+    return [(from_minutes(s), from_minutes(s + duration)) for s in starts]
+
+
+def _working_hours_for(barber_shop, target_date):
     day_of_week = target_date.weekday()  # 0=Monday, 6=Sunday
-    wh = WorkingHours.objects.filter(
+    return WorkingHours.objects.filter(
         barber_shop=barber_shop,
         day_of_week=day_of_week,
         is_closed=False
-    ).first()
+    )
+
+
+def get_available_slots(barber_shop, service, target_date, include_past=False):
+    """
+    Get available time slots for a barber shop on a given date.
+    Returns list of (start_time, end_time) tuples. With include_past=True
+    slots that already started today are kept (used by the slot cache,
+    which applies drop_past_slots on every read).
+
+    Runs a fixed number of queries (working hours + one occupancy-index
+    read) regardless of how long the working day is.
+    """
+    wh = _working_hours_for(barber_shop, target_date).first()
     if not wh:
         return []
+    booked = get_booked_intervals(barber_shop, target_date)
+    return slots_for_day(wh, service, booked, target_date, include_past)
 
-    # Build slots from start_time to end_time, each slot = service duration
-    from appointments.models import Appointment
-    duration = service.duration_minutes
-    slots = []
-    current = datetime.combine(target_date, wh.start_time)
-    end_dt = datetime.combine(target_date, wh.end_time)
 
-    while current + timedelta(minutes=duration) <= end_dt:
-        slot_start = current.time()
-        slot_end = (current + timedelta(minutes=duration)).time()
+async def aget_available_slots(barber_shop, service, target_date, include_past=False):
+    """Async (ASGI) counterpart of get_available_slots."""
+    from appointments import occupancy
+    wh = await _working_hours_for(barber_shop, target_date).afirst()
+    if not wh:
+        return []
+    booked = occupancy.intervals(await occupancy.aget_occupancy(barber_shop.pk, target_date))
+    return slots_for_day(wh, service, booked, target_date, include_past)
 
-        # Check if slot is already booked
-        is_booked = Appointment.objects.filter(
-            barber_shop=barber_shop,
-            date=target_date,
-            start_time=slot_start,
-            status__in=['PENDING', 'ACCEPTED']
-        ).exists()
 
-        # Don't offer past slots today
-        now = datetime.now().time()
-        if target_date == date.today() and slot_start <= now:
-            is_booked = True
+def get_booked_intervals_range(barber_shop, start_date, end_date):
+    """
+    Active bookings for a date range (inclusive), read from the occupancy index.
+    Returns {date: merged (start, end) minute intervals}.
+    """
+    from appointments import occupancy
+    entries = occupancy.get_occupancy_range(barber_shop.pk, start_date, end_date)
+    return {day: occupancy.intervals(day_entries) for day, day_entries in entries.items()}
+
 
-        if not is_booked:
-            slots.append((slot_start, slot_end))
+def build_calendar(hours_by_day, booked_by_date, services, start_date, end_date):
+    """
+    Assemble {date: {service_id: slots}} from prefetched working hours
+    ({weekday: WorkingHours}) and bookings ({date: merged intervals}).
+    """
+    calendar = {}
+    current = start_date
+    while current <= end_date:
+        wh = hours_by_day.get(current.weekday())
+        day_slots = {}
+        if wh:
+            booked = booked_by_date.get(current, [])
+            for service in services:
+                day_slots[service.pk] = slots_for_day(wh, service, booked, current)
+        calendar[current] = day_slots
+        current += timedelta(days=1)
+    return calendar
+
+
+def get_availability_range(barber_shop, services, start_date, end_date):
+    """
+    Available slots for every service on every date in a range (inclusive).
+    Returns {date: {service_id: [(start_time, end_time), ...]}}; closed days
+    map to an empty dict. Runs one working-hours query and one occupancy-index read.
+    """
+    hours_by_day = {
+        wh.day_of_week: wh
+        for wh in WorkingHours.objects.filter(barber_shop=barber_shop, is_closed=False)
+    }
+    booked_by_date = get_booked_intervals_range(barber_shop, start_date, end_date)
+    return build_calendar(hours_by_day, booked_by_date, services, start_date, end_date)
 
-        current += timedelta(minutes=30)  # 30-min increment between slots
 
-    return slots
+async def aget_availability_range(barber_shop, services, start_date, end_date):
+    """Async (ASGI) counterpart of get_availability_range."""
+    from appointments import occupancy
+    hours_by_day = {
+        wh.day_of_week: wh
+        async for wh in WorkingHours.objects.filter(barber_shop=barber_shop, is_closed=False)
+    }
+    entries = await occupancy.aget_occupancy_range(barber_shop.pk, start_date, end_date)
+    booked_by_date = {day: occupancy.intervals(day_entries) for day, day_entries in entries.items()}
+    return build_calendar(hours_by_day, booked_by_date, services, start_date, end_date)
@@ -1,15 +1,20 @@
 """
-Appointment views - Slots API, Cancel, Accept, Reject, Complete
+Appointment views - Slots API, Calendar API (sync + async), Cancel, Accept, Reject, Complete, Bulk status
 """
+from datetime import timedelta
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse, HttpResponseNotAllowed
+from django.template.loader import render_to_string
 from django.views.decorators.http import require_GET, require_POST
 from django.utils import timezone
 
-from authentication.decorators import customer_required, barber_required
+from authentication.decorators import customer_required, barber_required, async_login_required
 from .models import Appointment
-from .utils import get_available_slots
+from .utils import get_availability_range, aget_availability_range
+from . import slot_cache
+from .transitions import ALLOWED_FROM, MAX_BULK_IDS, bulk_transition
 from barbers.models import BarberShop, Service
 
 
@@ -34,9 +39,124 @@ def available_slots(request):
     except (BarberShop.DoesNotExist, Service.DoesNotExist, ValueError):
         return JsonResponse({'error': 'Invalid params'}, status=400)
 
-    slots = get_available_slots(shop, service, target_date)
-    data = [{'start': s[0].strftime('%H:%M'), 'end': s[1].strftime('%H:%M')} for s in slots]
-    return JsonResponse({'slots': data})
+    slots = slot_cache.get_cached_slots(shop, service, target_date)
+    return JsonResponse({'slots': _slots_json(slots)})
+
+
+@async_login_required
+async def available_slots_async(request):
+    """
+    API (ASGI): same contract as available_slots, served with the async
+    ORM and cache so a worker can hold many lookups without a thread each.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    shop_id = request.GET.get('shop_id')
+    service_id = request.GET.get('service_id')
+    date_str = request.GET.get('date')
+
+    if not all([shop_id, service_id, date_str]):
+        return JsonResponse({'error': 'Missing params'}, status=400)
+
+    try:
+        shop = await BarberShop.objects.aget(pk=shop_id)
+        service = await Service.objects.aget(pk=service_id, barber_shop=shop)
+        target_date = timezone.datetime.strptime(date_str, '%Y-%m-%d').date()
+    except (BarberShop.DoesNotExist, Service.DoesNotExist, ValueError):
+        return JsonResponse({'error': 'Invalid params'}, status=400)
+
+    slots = await slot_cache.aget_cached_slots(shop, service, target_date)
+    return JsonResponse({'slots': _slots_json(slots)})
+
+
+def _slots_json(slots):
+    return [{'start': s[0].strftime('%H:%M'), 'end': s[1].strftime('%H:%M')} for s in slots]
+
+
+@require_GET
+@staff_member_required
+def slot_cache_stats(request):
+    """API: hit/miss counters of the slot cache."""
+    return JsonResponse(slot_cache.get_stats())
+
+
+# Booking window offered to customers is today + 30 days (inclusive).
+MAX_CALENDAR_DAYS = 31
+
+
+@require_GET
+@login_required
+def availability_calendar(request):
+    """
+    API: GET ?shop_id=1&start=2025-01-15&days=31[&service_id=1]
+    Returns availability for every day in the range and every service of
+    the shop (or just service_id) in one response.
+    """
+    shop_id = request.GET.get('shop_id')
+    service_id = request.GET.get('service_id')
+    start_str = request.GET.get('start')
+
+    if not all([shop_id, start_str]):
+        return JsonResponse({'error': 'Missing params'}, status=400)
+
+    try:
+        shop = BarberShop.objects.get(pk=shop_id)
+        services = shop.services.all()
+        if service_id:
+            services = services.filter(pk=service_id)
+        services = list(services)
+        start_date = timezone.datetime.strptime(start_str, '%Y-%m-%d').date()
+        days = int(request.GET.get('days', MAX_CALENDAR_DAYS))
+    except (BarberShop.DoesNotExist, ValueError):
+        return JsonResponse({'error': 'Invalid params'}, status=400)
+    if not services or not 1 <= days <= MAX_CALENDAR_DAYS:
+        return JsonResponse({'error': 'Invalid params'}, status=400)
+
+    end_date = start_date + timedelta(days=days - 1)
+    calendar = get_availability_range(shop, services, start_date, end_date)
+    return JsonResponse({'days': _calendar_json(calendar)})
+
+
+@async_login_required
+async def availability_calendar_async(request):
+    """API (ASGI): same contract as availability_calendar, on the async ORM."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    shop_id = request.GET.get('shop_id')
+    service_id = request.GET.get('service_id')
+    start_str = request.GET.get('start')
+
+    if not all([shop_id, start_str]):
+        return JsonResponse({'error': 'Missing params'}, status=400)
+
+    try:
+        shop = await BarberShop.objects.aget(pk=shop_id)
+        services = Service.objects.filter(barber_shop=shop)
+        if service_id:
+            services = services.filter(pk=service_id)
+        services = [service async for service in services]
+        start_date = timezone.datetime.strptime(start_str, '%Y-%m-%d').date()
+        days = int(request.GET.get('days', MAX_CALENDAR_DAYS))
+    except (BarberShop.DoesNotExist, ValueError):
+        return JsonResponse({'error': 'Invalid params'}, status=400)
+    if not services or not 1 <= days <= MAX_CALENDAR_DAYS:
+        return JsonResponse({'error': 'Invalid params'}, status=400)
+
+    end_date = start_date + timedelta(days=days - 1)
+    calendar = await aget_availability_range(shop, services, start_date, end_date)
+    return JsonResponse({'days': _calendar_json(calendar)})
+
+
+def _calendar_json(calendar):
+    data = []
+    for day, by_service in calendar.items():
+        data.append({
+            'date': day.isoformat(),
+            'closed': not by_service,
+            'full': all(not slots for slots in by_service.values()),
+            'services': {str(pk): _slots_json(slots) for pk, slots in by_service.items()},
+        })
+    return data
 
 
 @require_POST
@@ -90,3 +210,34 @@ def complete_appointment(request, pk):
         appointment.status = Appointment.Status.COMPLETED
         appointment.save()
     return redirect('barbers:appointments')
+
+
+@require_POST
+@barber_required
+def bulk_status(request):
+    """
+    API: POST ids=1&ids=2&status=COMPLETED
+    Barber moves many appointments to a new status at once.
+    Returns JSON per-id results: updated / not_found / invalid_state, and
+    the row action buttons for the new status of every updated id.
+    """
+    target = request.POST.get('status')
+    try:
+        ids = list(dict.fromkeys(int(pk) for pk in request.POST.getlist('ids')))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid params'}, status=400)
+    if target not in ALLOWED_FROM or not ids or len(ids) > MAX_BULK_IDS:
+        return JsonResponse({'error': 'Invalid params'}, status=400)
+
+    results = bulk_transition(request.user.profile, ids, target)
+    updated = [pk for pk, outcome in results.items() if outcome == 'updated']
+    return JsonResponse({
+        'status': target,
+        'updated': len(updated),
+        'results': {str(pk): outcome for pk, outcome in results.items()},
+        'actions': {
+            str(pk): render_to_string('barbers/_appointment_actions.html',
+                                      {'apt': {'pk': pk, 'status': target}}, request=request)
+            for pk in updated
+        },
+    })
@@ -2,8 +2,12 @@
 Role-based access decorators for TrimTrove
 """
 from functools import wraps
+from asgiref.sync import sync_to_async
 from django.shortcuts import redirect
+from django.contrib.auth import get_user
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
+from .middleware import get_profile, get_role
 from .models import Profile
 
 
@@ -12,12 +16,11 @@ def customer_required(view_func):
     @wraps(view_func)
     @login_required
     def _wrapped(request, *args, **kwargs):
-        try:
-            profile = Profile.objects.get(user=request.user)
-            if profile.role != Profile.Role.CUSTOMER:
-                return redirect('barbers:dashboard')
-        except Profile.DoesNotExist:
+        profile = get_profile(request)
+        if profile is None:
             return redirect('auth:signup_complete')
+        if profile.role != Profile.Role.CUSTOMER:
+            return redirect('barbers:dashboard')
         return view_func(request, *args, **kwargs)
     return _wrapped
 
@@ -27,12 +30,11 @@ def barber_required(view_func):
     @wraps(view_func)
     @login_required
     def _wrapped(request, *args, **kwargs):
-        try:
-            profile = Profile.objects.get(user=request.user)
-            if profile.role != Profile.Role.BARBER:
-                return redirect('customers:dashboard')
-        except Profile.DoesNotExist:
+        profile = get_profile(request)
+        if profile is None:
             return redirect('auth:signup_complete')
+        if profile.role != Profile.Role.BARBER:
+            return redirect('customers:dashboard')
         return view_func(request, *args, **kwargs)
     return _wrapped
 
@@ -42,7 +44,36 @@ def signup_complete_required(view_func):
     @wraps(view_func)
     @login_required
     def _wrapped(request, *args, **kwargs):
-        if not Profile.objects.filter(user=request.user).exists():
+        if get_profile(request) is None:
             return redirect('auth:signup_complete')
         return view_func(request, *args, **kwargs)
     return _wrapped
+
+
+def async_login_required(view_func):
+    """
+    Decorator for async views: user must be logged in.
+    login_required resolves request.user lazily with sync DB calls, which
+    is not allowed on the event loop; resolve it once in a worker thread.
+    """
+    @wraps(view_func)
+    async def _wrapped(request, *args, **kwargs):
+        request.user = await sync_to_async(get_user)(request)
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return _wrapped
+
+
+def async_customer_required(view_func):
+    """Decorator for async views: customer_required without sync DB calls on the event loop."""
+    @wraps(view_func)
+    @async_login_required
+    async def _wrapped(request, *args, **kwargs):
+        role = await sync_to_async(get_role)(request)
+        if role is None:
+            return redirect('auth:signup_complete')
+        if role != Profile.Role.CUSTOMER:
+            return redirect('barbers:dashboard')
+        return await view_func(request, *args, **kwargs)
+    return _wrapped
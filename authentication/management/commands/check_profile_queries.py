@@ -0,0 +1,76 @@
+"""
+Query-count check: every page loads the user's Profile at most once.
+Run: python manage.py check_profile_queries
+
+Signs in a throwaway customer and barber (inside a transaction that is
+rolled back), requests their pages and counts queries on the Profile
+table. Role redirects must not touch it once the role is in the session.
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from authentication.models import Profile
+from barbers.models import BarberShop
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Fail if any page queries the Profile table more than once per request'
+
+    # Queries reading Profile rows themselves; joins through Profile (shop owner, customer) don't count.
+    profile_lookup = re.compile(rf'FROM "?{Profile._meta.db_table}"?\s')
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*']):
+            customer, barber = self._seed()
+            session_role = self._session_role_enabled()
+            # (label, user, url, max profile queries); pages first so the role reaches the session.
+            checks = [
+                ('customer dashboard', customer, reverse('customers:dashboard'), 1),
+                ('shop list', customer, reverse('customers:shops'), 1),
+                ('shop detail', customer, reverse('customers:shop_detail', args=[self.shop.pk]), 1),
+                ('customer appointments', customer, reverse('customers:appointments'), 1),
+                ('landing redirect', customer, reverse('landing'), 0 if session_role else 1),
+                ('login redirect', customer, reverse('auth:login'), 0 if session_role else 1),
+                ('barber dashboard', barber, reverse('barbers:dashboard'), 1),
+                ('barber appointments', barber, reverse('barbers:appointments'), 1),
+                ('wrong-role redirect', barber, reverse('customers:dashboard'), 1),
+                ('landing redirect (barber)', barber, reverse('landing'), 0 if session_role else 1),
+            ]
+            clients = {}
+            for label, user, url, limit in checks:
+                if user not in clients:
+                    clients[user] = Client()
+                    clients[user].force_login(user)
+                with CaptureQueriesContext(connection) as captured:
+                    response = clients[user].get(url)
+                count = sum(bool(self.profile_lookup.search(q['sql'])) for q in captured.captured_queries)
+                ok = count <= limit and response.status_code in (200, 302)
+                status = self.style.SUCCESS('ok') if ok else self.style.ERROR('FAIL')
+                self.stdout.write(f'{label:<28} {response.status_code}  profile queries {count} (max {limit})  {status}')
+                if not ok:
+                    failures.append(label)
+            transaction.set_rollback(True)
+        if failures:
+            raise CommandError(f'{len(failures)} page(s) over the Profile query budget: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('Every page resolved the Profile at most once.'))
+
+    def _session_role_enabled(self):
+        from authentication.middleware import _role_in_session
+        return _role_in_session()
+
+    def _seed(self):
+        customer = User.objects.create(username='profile-check-customer@trimtrove.local')
+        barber = User.objects.create(username='profile-check-barber@trimtrove.local')
+        Profile.objects.create(user=customer, role=Profile.Role.CUSTOMER)
+        owner = Profile.objects.create(user=barber, role=Profile.Role.BARBER)
+        self.shop = BarberShop.objects.create(name='Profile check shop', address='-', created_by=owner)
+        return customer, barber
@@ -0,0 +1,57 @@
+"""
+Authentication profile lookup - resolve the user's Profile at most once per request
+
+Decorators, views and the context processor call get_profile(request),
+which returns None for anonymous users and incomplete signups. Loading
+goes through the user's reverse accessor, so request.user.profile is
+free after.
+
+With PROFILE_ROLE_IN_SESSION the role is also kept in the session, so
+role-based redirects (landing page, post-login) need no Profile query.
+"""
+from django.conf import settings
+
+from .models import Profile
+
+ROLE_SESSION_KEY = '_profile_role'
+
+
+def _role_in_session():
+    return getattr(settings, 'PROFILE_ROLE_IN_SESSION', False)
+
+
+def get_profile(request):
+    """The request user's Profile, or None; one query per request at most."""
+    user = request.user
+    cached = getattr(request, '_profile_cache', None)
+    # Keyed by user so a login/logout mid-request is picked up.
+    if cached is None or cached[0] != user.pk:
+        profile = None
+        if user.is_authenticated:
+            try:
+                profile = user.profile
+            except Profile.DoesNotExist:
+                pass
+        remember_profile(request, profile)
+    return request._profile_cache[1]
+
+
+def remember_profile(request, profile):
+    """Record a just-loaded or just-created profile for the rest of the request."""
+    request._profile_cache = (request.user.pk, profile)
+    if _role_in_session() and hasattr(request, 'session'):
+        role = [request.user.pk, profile.role] if profile else None
+        if request.session.get(ROLE_SESSION_KEY) != role:
+            request.session[ROLE_SESSION_KEY] = role
+
+
+def get_role(request):
+    """The user's role (None without a profile), from the session when cached there."""
+    if not request.user.is_authenticated:
+        return None
+    if _role_in_session():
+        cached = request.session.get(ROLE_SESSION_KEY)
+        if cached and cached[0] == request.user.pk:
+            return cached[1]
+    profile = get_profile(request)
+    return profile.role if profile else None
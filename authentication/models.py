@@ -4,6 +4,8 @@ Authentication models - Profile extends User with role (Customer/Barber)
 from django.db import models
 from django.conf import settings
 
+from trimtrove.thumbnails import Thumbs
+
 
 class Profile(models.Model):
     """Extended user profile with role and contact info."""
@@ -24,12 +26,19 @@ class Profile(models.Model):
     )
     phone = models.CharField(max_length=15, blank=True)
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    # Resized variants of `avatar`, written by trimtrove.thumbnails
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.get_full_name() or self.user.username} ({self.get_role_display()})"
 
+    @property
+    def avatar_thumbs(self):
+        """srcset helper for `avatar`; falls back to the original until variants exist."""
+        return Thumbs(self.avatar, self.avatar_variants)
+
     @property
     def is_customer(self):
         return self.role == self.Role.CUSTOMER
@@ -0,0 +1,14 @@
+"""
+Authentication signals - thumbnail new avatars
+"""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from trimtrove import thumbnails
+from .models import Profile
+
+
+@receiver(post_save, sender=Profile)
+def build_avatar_variants(sender, instance, raw=False, **kwargs):
+    if not raw and instance.avatar and not thumbnails.is_current(instance.avatar, instance.avatar_variants):
+        thumbnails.schedule(instance, 'avatar', 'avatar_variants')
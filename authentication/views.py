@@ -7,18 +7,18 @@ from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 
 from .forms import LoginForm, CustomerSignupForm, BarberSignupForm, SignupCompleteForm
+from .middleware import get_profile, get_role, remember_profile
 from .models import Profile
 
 
 def redirect_after_login(request):
     """Redirect user to appropriate dashboard based on role."""
-    try:
-        profile = Profile.objects.get(user=request.user)
-        if profile.role == Profile.Role.BARBER:
-            return redirect('barbers:dashboard')
-        return redirect('customers:dashboard')
-    except Profile.DoesNotExist:
+    role = get_role(request)
+    if role is None:
         return redirect('auth:signup_complete')
+    if role == Profile.Role.BARBER:
+        return redirect('barbers:dashboard')
+    return redirect('customers:dashboard')
 
 
 @require_http_methods(["GET", "POST"])
@@ -56,7 +56,7 @@ def signup_view(request, role='customer'):
 @require_http_methods(["GET", "POST"])
 def signup_complete(request):
     """Complete profile for users who signed up before profile existed."""
-    if Profile.objects.filter(user=request.user).exists():
+    if get_profile(request) is not None:
         return redirect_after_login(request)
 
     form = SignupCompleteForm(request.POST or None)
@@ -64,6 +64,7 @@ def signup_complete(request):
         profile = form.save(commit=False)
         profile.user = request.user
         profile.save()
+        remember_profile(request, profile)
         return redirect_after_login(request)
 
     return render(request, 'auth/signup_complete.html', {'form': form})
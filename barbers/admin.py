@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import BarberShop, Service, WorkingHours
+from .models import BarberShop, Review, Service, ShopStats, WorkingHours
 
 
 class ServiceInline(admin.TabularInline):
@@ -29,3 +29,17 @@ class ServiceAdmin(admin.ModelAdmin):
 @admin.register(WorkingHours)
 class WorkingHoursAdmin(admin.ModelAdmin):
     list_display = ('barber_shop', 'day_of_week', 'start_time', 'end_time', 'is_closed')
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    list_display = ('barber_shop', 'customer', 'rating', 'updated_at')
+    list_filter = ('rating',)
+
+
+@admin.register(ShopStats)
+class ShopStatsAdmin(admin.ModelAdmin):
+    # Maintained by barbers.stats; fix drift with `manage.py reconcile_shop_stats`.
+    list_display = ('barber_shop', 'rating_count', 'avg_rating', 'service_count', 'completed_appointments')
+    readonly_fields = ('rating_sum', 'rating_count', 'service_count', 'min_price', 'max_price',
+                       'completed_appointments', 'updated_at')
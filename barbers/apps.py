@@ -5,3 +5,6 @@ class BarbersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'barbers'
     verbose_name = 'Barbers'
+
+    def ready(self):
+        from . import signals  # noqa: F401
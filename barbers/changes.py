@@ -0,0 +1,31 @@
+"""
+Shop change marker - a cache token that moves whenever a shop's updated_at does
+
+Every write that touches BarberShop.updated_at (shop saves, the
+touch_shop signal, stats touches and reconcile) calls mark_changed(),
+which replaces the token once the transaction commits. The dashboard
+feed compares tokens and only queries the database when it moved. With
+a per-process cache (LocMemCache) a change made by another process is
+not seen until the feed's next request, which always checks the
+database once.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+CHANGE_KEY = 'shops:changed'
+
+
+def _new_token():
+    cache.set(CHANGE_KEY, uuid.uuid4().hex[:12], None)
+
+
+def mark_changed():
+    """Move the change token after the current transaction (if any) commits."""
+    transaction.on_commit(_new_token)
+
+
+async def atoken():
+    """The current change token (None until the first change)."""
+    return await cache.aget(CHANGE_KEY)
@@ -0,0 +1,78 @@
+"""
+Geo utilities - grid index, bounding boxes and haversine ranking for "nearby"
+
+Every shop with coordinates is assigned a grid cell (GRID_DEGREES square)
+on save. A nearby search turns the search radius into a bounding box,
+filters candidates in SQL on the indexed cell columns plus the exact
+lat/lng box, then ranks the survivors by exact haversine distance.
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+# ~5.5 km cells: a city-sized radius touches a handful of rows/columns.
+GRID_DEGREES = 0.05
+DEFAULT_RADIUS_KM = 5
+MAX_RADIUS_KM = 100
+MAX_RESULTS = 100
+
+
+def grid_cell(lat, lng):
+    """(row, col) of the grid cell containing a point."""
+    return math.floor(float(lat) / GRID_DEGREES), math.floor(float(lng) / GRID_DEGREES)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (float(lat1), float(lng1), float(lat2), float(lng2)))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bounding_box(lat, lng, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a circle."""
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    # Clamp so the longitude span stays finite near the poles.
+    d_lng = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return lat - d_lat, lat + d_lat, lng - d_lng, lng + d_lng
+
+
+def k_nearest(queryset, lat, lng, k, max_radius_km=MAX_RADIUS_KM):
+    """
+    The k shops nearest to (lat, lng), searching outwards by doubling the
+    radius. Once k shops fall inside a radius they are the true k nearest.
+    """
+    radius = DEFAULT_RADIUS_KM
+    while True:
+        found = nearby_shops(queryset, lat, lng, radius, k)
+        if len(found) >= k or radius >= max_radius_km:
+            return found
+        radius = min(radius * 2, max_radius_km)
+
+
+def nearby_shops(queryset, lat, lng, radius_km=DEFAULT_RADIUS_KM, k=None):
+    """
+    Shops from `queryset` within radius_km of (lat, lng), nearest first.
+    Returns a list of shops with a `distance_km` attribute, at most k.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    row_min, col_min = grid_cell(min_lat, min_lng)
+    row_max, col_max = grid_cell(max_lat, max_lng)
+    candidates = queryset.filter(
+        grid_row__range=(row_min, row_max),
+        grid_col__range=(col_min, col_max),
+        latitude__range=(min_lat, max_lat),
+        longitude__range=(min_lng, max_lng),
+    )
+    ranked = []
+    for shop in candidates:
+        distance = haversine_km(lat, lng, shop.latitude, shop.longitude)
+        if distance <= radius_km:
+            ranked.append((distance, shop.pk, shop))
+    ranked.sort(key=lambda item: item[:2])
+    if k:
+        ranked = ranked[:k]
+    for distance, _, shop in ranked:
+        shop.distance_km = round(distance, 2)
+    return [shop for _, _, shop in ranked]
@@ -0,0 +1,96 @@
+"""
+Benchmark the nearby-shops search against a brute-force haversine scan.
+Run: python manage.py bench_nearby [--shops 30000] [--queries 50]
+Synthetic shops are created inside a transaction that is rolled back.
+"""
+import random
+import time as timer
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from authentication.models import Profile
+from barbers import geo
+from barbers.models import BarberShop
+
+User = get_user_model()
+
+# (lat, lng) of city centres shops are scattered around.
+CITIES = [
+    (12.9716, 77.5946),  # Bangalore
+    (19.0760, 72.8777),  # Mumbai
+    (28.6139, 77.2090),  # Delhi
+    (13.0827, 80.2707),  # Chennai
+    (17.3850, 78.4867),  # Hyderabad
+    (22.5726, 88.3639),  # Kolkata
+    (18.5204, 73.8567),  # Pune
+    (23.0225, 72.5714),  # Ahmedabad
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare grid-indexed nearby search with a brute-force scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shops', type=int, default=30000)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--radius', type=float, default=geo.DEFAULT_RADIUS_KM)
+        parser.add_argument('--k', type=int, default=20)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        with transaction.atomic():
+            self._seed(rng, options['shops'])
+            points = [self._point(rng) for _ in range(options['queries'])]
+            self._compare(points, options['radius'], options['k'])
+            transaction.set_rollback(True)
+
+    def _point(self, rng):
+        lat, lng = rng.choice(CITIES)
+        # ~15 km spread around the centre.
+        return lat + rng.gauss(0, 0.12), lng + rng.gauss(0, 0.12)
+
+    def _seed(self, rng, count):
+        owner = Profile.objects.create(
+            user=User.objects.create(username='bench-nearby@trimtrove.local'), role=Profile.Role.BARBER
+        )
+        batch = []
+        for i in range(count):
+            lat, lng = self._point(rng)
+            shop = BarberShop(name=f'Bench shop {i}', address='-', created_by=owner,
+                              latitude=round(lat, 6), longitude=round(lng, 6))
+            shop.assign_grid_cell()
+            batch.append(shop)
+        BarberShop.objects.bulk_create(batch, batch_size=1000)
+        self.stdout.write(f'Seeded {count} shops.')
+
+    def _brute_force(self, lat, lng, radius, k):
+        ranked = []
+        for pk, s_lat, s_lng in BarberShop.objects.filter(latitude__isnull=False).values_list(
+            'pk', 'latitude', 'longitude'
+        ):
+            distance = geo.haversine_km(lat, lng, s_lat, s_lng)
+            if distance <= radius:
+                ranked.append((distance, pk))
+        ranked.sort()
+        return [pk for _, pk in ranked[:k]]
+
+    def _compare(self, points, radius, k):
+        shops = BarberShop.objects.only('pk', 'latitude', 'longitude')
+        timings = {'brute force': 0.0, 'grid index': 0.0}
+        mismatches = 0
+        for lat, lng in points:
+            started = timer.perf_counter()
+            expected = self._brute_force(lat, lng, radius, k)
+            timings['brute force'] += timer.perf_counter() - started
+
+            started = timer.perf_counter()
+            found = [shop.pk for shop in geo.nearby_shops(shops, lat, lng, radius, k)]
+            timings['grid index'] += timer.perf_counter() - started
+            mismatches += found != expected
+
+        for label, total in timings.items():
+            self.stdout.write(f'{label:<12} {total * 1000 / len(points):8.2f} ms/query')
+        self.stdout.write(f'speedup      {timings["brute force"] / timings["grid index"]:8.1f}x')
+        self.stdout.write(f'mismatches   {mismatches}')
@@ -0,0 +1,86 @@
+"""
+Benchmark shop search: full-text index vs. the old icontains scan.
+Run: python manage.py bench_search [--shops 100000] [--queries 30]
+Synthetic shops are created inside a transaction that is rolled back.
+"""
+import random
+import time as timer
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from authentication.models import Profile
+from barbers import search
+from barbers.models import BarberShop, Service
+
+User = get_user_model()
+
+NAME_WORDS = ['Classic', 'Royal', 'Urban', 'Sharp', 'Style', 'Gentlemen', 'Trim', 'Fade', 'Crown', 'Blade',
+              'Studio', 'Cuts', 'Salon', 'Lounge', 'Parlour', 'Grooming', 'Barbers', 'Kings', 'Edge', 'Mane']
+AREAS = ['MG Road', 'Indiranagar', 'Koramangala', 'Jayanagar', 'Whitefield', 'HSR Layout', 'Malleshwaram',
+         'Bandra', 'Andheri', 'Connaught Place', 'Saket', 'T Nagar', 'Banjara Hills', 'Salt Lake']
+CITIES = ['Bangalore', 'Mumbai', 'Delhi', 'Chennai', 'Hyderabad', 'Kolkata', 'Pune']
+SERVICES = ['Haircut', 'Beard Trim', 'Shave', 'Head Massage', 'Hair Colour', 'Facial', 'Kids Haircut', 'Keratin']
+QUERIES = ['royal', 'fade studio', 'koramangala', 'massage', 'keratin', 'bandra', 'crown cuts', 'facial pune']
+
+
+class Command(BaseCommand):
+    help = 'Compare full-text shop search latency with an icontains scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shops', type=int, default=100000)
+        parser.add_argument('--queries', type=int, default=30)
+
+    def handle(self, *args, **options):
+        backend = search.get_backend()
+        self.stdout.write(f'Backend: {type(backend).__name__}')
+        rng = random.Random(7)
+        with transaction.atomic():
+            self._seed(rng, options['shops'])
+            started = timer.perf_counter()
+            backend.rebuild()
+            self.stdout.write(f'Index rebuild: {timer.perf_counter() - started:.1f}s')
+            queries = [rng.choice(QUERIES) for _ in range(options['queries'])]
+            self._report('icontains scan', queries, self._like)
+            self._report('full-text index', queries, search.search_shops)
+            transaction.set_rollback(True)
+
+    def _seed(self, rng, count, batch_size=5000):
+        owner = Profile.objects.create(
+            user=User.objects.create(username='bench-search@trimtrove.local'), role=Profile.Role.BARBER
+        )
+        for start in range(0, count, batch_size):
+            shops = BarberShop.objects.bulk_create([
+                BarberShop(
+                    name=f'{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {i}',
+                    address=f'{rng.randint(1, 400)} {rng.choice(AREAS)}, {rng.choice(CITIES)}',
+                    description='Walk-ins welcome. Hygienic, air-conditioned, experienced barbers.',
+                    created_by=owner,
+                )
+                for i in range(start, min(start + batch_size, count))
+            ])
+            Service.objects.bulk_create([
+                Service(barber_shop=shop, name=name, price=rng.randint(80, 800))
+                for shop in shops
+                for name in rng.sample(SERVICES, 3)
+            ])
+        self.stdout.write(f'Seeded {count} shops.')
+
+    def _like(self, q):
+        # What shop_list did before the index, extended to services for a fair comparison.
+        return list(BarberShop.objects.filter(
+            Q(name__icontains=q) | Q(address__icontains=q) | Q(services__name__icontains=q)
+        ).distinct()[:search.SEARCH_LIMIT])
+
+    def _report(self, label, queries, func):
+        timings = []
+        for q in queries:
+            started = timer.perf_counter()
+            func(q)
+            timings.append((timer.perf_counter() - started) * 1000)
+        timings.sort()
+        p50 = timings[len(timings) // 2]
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(f'{label:<16} p50 {p50:8.2f} ms   p95 {p95:8.2f} ms')
@@ -0,0 +1,322 @@
+"""
+Generate production-sized synthetic data for load and performance testing.
+Run: python manage.py generate_data [--barbers 100] [--shops 300] [--services-per-shop 6]
+         [--customers 20000] [--appointments-per-day 12] [--months 6] [--seed 1]
+
+Rows are streamed in batches, so memory stays flat however many
+appointments are generated. Appointments skip the ORM's per-row SQL
+compilation and go through one prepared executemany() per batch, which
+keeps millions of rows to minutes. Shops are
+scattered around Bangalore neighbourhoods; appointments are packed into
+each shop's opening hours without overlaps, busier on weekends, with
+realistic status mixes for past and upcoming days.
+
+Neither path sends model signals, so the search index, shop stats and
+daily rollups (every day of the generated range) are built for the new
+shops at the end. Occupancy rows are built lazily on
+first read and new shops have no cached slots, so neither needs a rebuild.
+Every generated username starts with --prefix; use a fresh database (or a
+new prefix) for each run. All users share the password "password".
+"""
+import math
+import random
+import time as timer
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from authentication.models import Profile
+from appointments.models import Appointment
+from barbers import search, stats
+from barbers.models import BarberShop, Review, Service, WorkingHours
+
+User = get_user_model()
+
+# (name, lat, lng, weight): neighbourhood centres shops cluster around.
+NEIGHBOURHOODS = [
+    ('MG Road', 12.9756, 77.6050, 8),
+    ('Indiranagar', 12.9784, 77.6408, 10),
+    ('Koramangala', 12.9352, 77.6245, 12),
+    ('HSR Layout', 12.9116, 77.6474, 8),
+    ('Jayanagar', 12.9299, 77.5826, 9),
+    ('JP Nagar', 12.9063, 77.5857, 7),
+    ('Malleshwaram', 13.0031, 77.5643, 6),
+    ('Rajajinagar', 12.9982, 77.5530, 5),
+    ('Hebbal', 13.0358, 77.5970, 4),
+    ('Whitefield', 12.9698, 77.7500, 8),
+    ('Marathahalli', 12.9591, 77.6974, 7),
+    ('Electronic City', 12.8452, 77.6602, 6),
+    ('BTM Layout', 12.9166, 77.6101, 7),
+    ('Yelahanka', 13.1007, 77.5963, 3),
+]
+NAME_WORDS = ['Classic', 'Royal', 'Urban', 'Sharp', 'Style', 'Gentlemen', 'Trim', 'Fade', 'Crown', 'Blade',
+              'Studio', 'Cuts', 'Salon', 'Lounge', 'Parlour', 'Grooming', 'Barbers', 'Kings', 'Edge', 'Mane']
+# (name, min price, max price, typical durations in minutes)
+SERVICES = [
+    ('Haircut', 100, 400, (20, 25, 30, 30, 30, 40)),
+    ('Beard Trim', 50, 200, (10, 15, 15, 20)),
+    ('Shave', 60, 200, (15, 20, 20, 25)),
+    ('Haircut + Beard', 150, 550, (40, 45, 45, 60)),
+    ('Kids Haircut', 80, 250, (20, 20, 25, 30)),
+    ('Head Massage', 100, 400, (15, 20, 30)),
+    ('Hair Colour', 300, 1500, (45, 60, 60, 90)),
+    ('Hair Spa', 400, 1500, (45, 60)),
+    ('Facial', 300, 1200, (30, 45, 60)),
+    ('Keratin', 1500, 4000, (90, 120)),
+    ('Styling', 150, 500, (15, 20, 30)),
+    ('Clean Shave + Massage', 150, 450, (30, 40)),
+]
+FIRST_NAMES = ['Aarav', 'Vihaan', 'Arjun', 'Rohan', 'Karthik', 'Rahul', 'Aditya', 'Siddharth', 'Pranav', 'Nikhil',
+               'Ananya', 'Diya', 'Priya', 'Sneha', 'Kavya', 'Meera', 'Ishaan', 'Varun', 'Manoj', 'Suresh']
+LAST_NAMES = ['Sharma', 'Reddy', 'Rao', 'Iyer', 'Nair', 'Kumar', 'Gowda', 'Shetty', 'Patel', 'Singh', 'Menon', 'Das']
+PAST_STATUSES = (
+    [Appointment.Status.COMPLETED, Appointment.Status.CANCELLED, Appointment.Status.REJECTED,
+     Appointment.Status.ACCEPTED],
+    [80, 13, 5, 2],
+)
+UPCOMING_STATUSES = (
+    [Appointment.Status.PENDING, Appointment.Status.ACCEPTED, Appointment.Status.CANCELLED],
+    [45, 45, 10],
+)
+RATINGS = ([1, 2, 3, 4, 5], [3, 5, 12, 35, 45])
+# Mon..Sun demand relative to the average day.
+WEEKDAY_DEMAND = [0.8, 0.75, 0.8, 0.85, 1.05, 1.45, 1.3]
+
+
+class Command(BaseCommand):
+    help = 'Stream large volumes of realistic synthetic shops, customers and appointments into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--barbers', type=int, default=100)
+        parser.add_argument('--shops', type=int, default=300)
+        parser.add_argument('--services-per-shop', type=int, default=6)
+        parser.add_argument('--customers', type=int, default=20000)
+        parser.add_argument('--appointments-per-day', type=float, default=12,
+                            help='Average appointments per shop per day')
+        parser.add_argument('--months', type=int, default=6, help='Months of history before today')
+        parser.add_argument('--upcoming-days', type=int, default=14, help='Days of future bookings after today')
+        parser.add_argument('--reviews-per-shop', type=int, default=15)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--prefix', default='gen', help='Username prefix for generated users')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{self.prefix}-').exists():
+            raise CommandError(f'Users with prefix "{self.prefix}-" already exist; use a fresh database or --prefix.')
+        if options['barbers'] < 1 or options['shops'] < 1 or options['customers'] < 1:
+            raise CommandError('--barbers, --shops and --customers must be at least 1.')
+
+        started = timer.perf_counter()
+        self.password = make_password('password')
+        barbers = self._profiles('barber', options['barbers'], Profile.Role.BARBER)
+        customers = self._profiles('customer', options['customers'], Profile.Role.CUSTOMER)
+        shops = self._shops(options['shops'], barbers)
+        services = self._services(shops, options['services_per_shop'])
+        hours = self._working_hours(shops)
+        self._reviews(shops, customers, options['reviews_per_shop'])
+
+        today = date.today()
+        start = today - timedelta(days=30 * options['months'])
+        end = today + timedelta(days=options['upcoming_days'])
+        total = self._appointments(shops, services, hours, customers, start, end, today,
+                                   options['appointments_per_day'])
+
+        self.stdout.write('Indexing shops for search, computing shop stats and daily rollups...')
+        for i in range(0, len(shops), 1000):
+            batch = [shop.pk for shop in shops[i:i + 1000]]
+            search.get_backend().index_shops(batch)
+            stats.reconcile(batch)
+            call_command('backfill_rollups', shop=batch, start=start, end=end, stdout=StringIO())
+
+        elapsed = timer.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(barbers)} barbers, {len(customers)} customers, {len(shops)} shops and '
+            f'{total} appointments ({start} to {end}) in {elapsed:.1f}s.'
+        ))
+        self.stdout.write(f'Log in as {self.prefix}-customer-0@trimtrove.local or '
+                          f'{self.prefix}-barber-0@trimtrove.local with password "password".')
+
+    def _bulk(self, model, rows):
+        """bulk_create an iterable in batches, returning the saved objects (with pks)."""
+        saved, batch = [], []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                saved += model.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            saved += model.objects.bulk_create(batch)
+        return saved
+
+    def _profiles(self, kind, count, role):
+        rng = self.rng
+        users = self._bulk(User, (
+            User(
+                username=f'{self.prefix}-{kind}-{i}@trimtrove.local',
+                email=f'{self.prefix}-{kind}-{i}@trimtrove.local',
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                password=self.password,
+            )
+            for i in range(count)
+        ))
+        profiles = self._bulk(Profile, (
+            Profile(user_id=user.pk, role=role, phone=f'9{rng.randint(100000000, 999999999)}') for user in users
+        ))
+        self.stdout.write(f'{len(profiles)} {kind}s')
+        return [profile.pk for profile in profiles]
+
+    def _shops(self, count, barbers):
+        rng = self.rng
+        weights = [n[3] for n in NEIGHBOURHOODS]
+
+        def shop(i):
+            area, lat, lng, _ = rng.choices(NEIGHBOURHOODS, weights)[0]
+            # ~1.5 km spread around the neighbourhood centre.
+            shop = BarberShop(
+                name=f'{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {area}',
+                description='Walk-ins welcome. Hygienic, air-conditioned, experienced barbers.',
+                address=f'{rng.randint(1, 400)}, {rng.randint(1, 40)}th Cross, {area}, Bangalore',
+                latitude=round(lat + rng.gauss(0, 0.013), 6),
+                longitude=round(lng + rng.gauss(0, 0.013), 6),
+                phone=f'80{rng.randint(10000000, 99999999)}',
+                created_by_id=barbers[i % len(barbers)],
+            )
+            shop.assign_grid_cell()
+            return shop
+
+        shops = self._bulk(BarberShop, (shop(i) for i in range(count)))
+        self.stdout.write(f'{len(shops)} shops')
+        return shops
+
+    def _services(self, shops, per_shop):
+        """{shop_id: [(service_id, duration_minutes), ...]}"""
+        rng = self.rng
+        per_shop = max(1, min(per_shop, len(SERVICES)))
+
+        def rows():
+            for shop in shops:
+                # Every shop cuts hair; the rest of the menu varies.
+                for name, low, high, durations in [SERVICES[0]] + rng.sample(SERVICES[1:], per_shop - 1):
+                    yield Service(barber_shop_id=shop.pk, name=name, price=rng.randrange(low, high + 1, 10),
+                                  duration_minutes=rng.choice(durations))
+
+        services = {}
+        for service in self._bulk(Service, rows()):
+            services.setdefault(service.barber_shop_id, []).append((service.pk, service.duration_minutes))
+        self.stdout.write(f'{sum(len(s) for s in services.values())} services')
+        return services
+
+    def _working_hours(self, shops):
+        """{shop_id: {weekday: (open_minute, close_minute) or None}}"""
+        rng = self.rng
+        hours = {}
+
+        def rows():
+            for shop in shops:
+                opens, closes = rng.choice([(9, 20), (9, 21), (10, 21), (10, 22), (8, 20)])
+                # Many shops close one day a week, Tuesday or Sunday.
+                closed_day = rng.choices([None, 1, 6], [50, 30, 20])[0]
+                hours[shop.pk] = {}
+                for day in range(7):
+                    closed = day == closed_day
+                    hours[shop.pk][day] = None if closed else (opens * 60, closes * 60)
+                    yield WorkingHours(barber_shop_id=shop.pk, day_of_week=day, start_time=time(opens),
+                                       end_time=time(closes), is_closed=closed)
+
+        self._bulk(WorkingHours, rows())
+        return hours
+
+    def _reviews(self, shops, customers, per_shop):
+        rng = self.rng
+
+        def rows():
+            for shop in shops:
+                count = min(len(customers), max(0, int(rng.gauss(per_shop, per_shop / 3))))
+                for customer in rng.sample(customers, count):
+                    yield Review(barber_shop_id=shop.pk, customer_id=customer,
+                                 rating=rng.choices(*RATINGS)[0])
+
+        self.stdout.write(f'{len(self._bulk(Review, rows()))} reviews')
+
+    def _appointments(self, shops, services, hours, customers, start, end, today, per_day):
+        rng = self.rng
+        # Shop popularity is long-tailed: most are average, a few are very busy.
+        # (exp(sigma^2 / 2) is the lognormal mean, so the average stays per_day.)
+        demand = {shop.pk: per_day * rng.lognormvariate(0, 0.5) / math.exp(0.125) for shop in shops}
+        ops = connection.ops
+        now = ops.adapt_datetimefield_value(timezone.now())
+        times = {}
+        total = 0
+        batch = []
+        day = start
+        report_at = timer.perf_counter()
+        while day <= end:
+            statuses = PAST_STATUSES if day < today else UPCOMING_STATUSES
+            day_value = ops.adapt_datefield_value(day)
+            for shop in shops:
+                open_hours = hours[shop.pk][day.weekday()]
+                if open_hours is None:
+                    continue
+                wanted = self._poisson(demand[shop.pk] * WEEKDAY_DEMAND[day.weekday()])
+                for start_minute, service_id in self._day_plan(open_hours, services[shop.pk], wanted):
+                    if start_minute not in times:
+                        times[start_minute] = ops.adapt_timefield_value(time(start_minute // 60, start_minute % 60))
+                    # Regular customers book far more often than the long tail.
+                    customer = customers[int(len(customers) * rng.random() ** 1.6)]
+                    batch.append((customer, shop.pk, service_id, day_value, times[start_minute],
+                                  rng.choices(*statuses)[0], '', now, now))
+                if len(batch) >= self.batch_size:
+                    total += self._flush(batch)
+                    batch = []
+            if timer.perf_counter() - report_at > 5:
+                report_at = timer.perf_counter()
+                self.stdout.write(f'  ...{day}: {total} appointments')
+            day += timedelta(days=1)
+        if batch:
+            total += self._flush(batch)
+        return total
+
+    def _flush(self, batch):
+        fields = ('customer', 'barber_shop', 'service', 'date', 'start_time', 'status', 'notes',
+                  'created_at', 'updated_at')
+        qn = connection.ops.quote_name
+        columns = ', '.join(qn(Appointment._meta.get_field(name).column) for name in fields)
+        sql = (f'INSERT INTO {qn(Appointment._meta.db_table)} ({columns}) '
+               f'VALUES ({", ".join(["%s"] * len(fields))})')
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, batch)
+        return len(batch)
+
+    def _day_plan(self, open_hours, shop_services, wanted):
+        """Up to `wanted` non-overlapping (start_minute, service_id) bookings inside opening hours."""
+        rng = self.rng
+        opens, closes = open_hours
+        minute = opens + rng.choice((0, 0, 30, 60))
+        plan = []
+        while len(plan) < wanted:
+            service_id, duration = shop_services[0] if rng.random() < 0.5 else rng.choice(shop_services)
+            if minute + duration > closes:
+                break
+            plan.append((minute, service_id))
+            # Round the next start up to a quarter hour, sometimes leaving a gap.
+            minute = -(-(minute + duration) // 15) * 15 + rng.choice((0, 0, 0, 15, 30, 60))
+        return plan
+
+    def _poisson(self, mean):
+        # Knuth's method is fine for the small means used here.
+        limit, k, p = math.exp(-mean), 0, 1.0
+        while True:
+            p *= self.rng.random()
+            if p <= limit:
+                return k
+            k += 1
@@ -0,0 +1,66 @@
+"""
+Build resized JPEG/WebP variants for existing shop images and avatars.
+Run: python manage.py generate_thumbnails [--force] [--workers N]
+
+New uploads are thumbnailed in the background as they are saved (see
+trimtrove.thumbnails); this backfills media uploaded before that, or
+rebuilds everything with --force after THUMBNAIL_WIDTHS changes.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from authentication.models import Profile
+from barbers.models import BarberShop
+from trimtrove import thumbnails
+
+# (model, image field, variants field)
+TARGETS = (
+    (BarberShop, 'image', 'image_variants'),
+    (Profile, 'avatar', 'avatar_variants'),
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate missing thumbnail variants for shop images and avatars'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild variants that are already current')
+        parser.add_argument('--workers', type=int, help='Worker processes (default THUMBNAIL_WORKERS)')
+
+    def handle(self, *args, **options):
+        failed = 0
+        workers = options['workers'] or thumbnails.worker_count()
+        with thumbnails.process_pool(workers) as pool:
+            for model, field_name, variants_field in TARGETS:
+                rows = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                ids = [
+                    row.pk for row in rows.only('pk', field_name, variants_field).iterator()
+                    if options['force'] or not thumbnails.is_current(getattr(row, field_name), getattr(row, variants_field))
+                ]
+                label = model._meta.verbose_name_plural
+                if not ids:
+                    self.stdout.write(f'{label}: nothing to do')
+                    continue
+
+                def build(pk):
+                    try:
+                        thumbnails.build(model, pk, field_name, variants_field, pool)
+                        return None
+                    except Exception as exc:
+                        return f'{model._meta.label} {pk}: {exc}'
+                    finally:
+                        connections.close_all()
+
+                # One thread per worker process keeps the pool busy while others do file and DB I/O.
+                with ThreadPoolExecutor(max_workers=workers) as threads:
+                    errors = [error for error in threads.map(build, ids) if error]
+                for error in errors:
+                    self.stdout.write(self.style.WARNING(error))
+                failed += len(errors)
+                self.stdout.write(f'{label}: {len(ids) - len(errors)} of {len(ids)} thumbnailed')
+
+        if failed:
+            raise CommandError(f'{failed} image(s) could not be thumbnailed.')
+        self.stdout.write(self.style.SUCCESS('Thumbnails are up to date.'))
@@ -0,0 +1,30 @@
+"""
+Recompute (or verify) per-shop stats from the Service, Review and Appointment tables.
+Run: python manage.py reconcile_shop_stats [--verify] [--shop ID ...]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from barbers import stats
+
+
+class Command(BaseCommand):
+    help = 'Rewrite ShopStats rows that disagree with the source tables (or with --verify, report them)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Only compare stats with the source tables; exit non-zero on drift')
+        parser.add_argument('--shop', type=int, nargs='+', help='Limit to these shop ids')
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            expected, missing, stale = stats.drift(options['shop'])
+            for pk in missing:
+                self.stdout.write(self.style.WARNING(f'shop {pk}: stats row missing'))
+            for pk in stale:
+                self.stdout.write(self.style.WARNING(f'shop {pk}: stats out of date'))
+            if missing or stale:
+                raise CommandError(f'{len(missing) + len(stale)} of {len(expected)} shop stats row(s) need reconciling.')
+            self.stdout.write(self.style.SUCCESS(f'Stats for {len(expected)} shop(s) match the source tables.'))
+            return
+        fixed = stats.reconcile(options['shop'])
+        self.stdout.write(self.style.SUCCESS(f'Reconciled stats for {len(fixed)} shop(s).'))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='barbershop',
+            index=models.Index(fields=['updated_at'], name='shop_updated_at_idx'),
+        ),
+    ]
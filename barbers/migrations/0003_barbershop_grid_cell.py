@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:40
+
+from django.db import migrations, models
+
+
+def assign_grid_cells(apps, schema_editor):
+    from barbers.geo import grid_cell
+    BarberShop = apps.get_model('barbers', 'BarberShop')
+    shops = list(BarberShop.objects.filter(latitude__isnull=False, longitude__isnull=False))
+    for shop in shops:
+        shop.grid_row, shop.grid_col = grid_cell(shop.latitude, shop.longitude)
+    BarberShop.objects.bulk_update(shops, ['grid_row', 'grid_col'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbers', '0002_barbershop_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='barbershop',
+            name='grid_col',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='barbershop',
+            name='grid_row',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='barbershop',
+            index=models.Index(fields=['grid_row', 'grid_col', 'latitude', 'longitude'], name='shop_grid_idx'),
+        ),
+        migrations.RunPython(assign_grid_cells, migrations.RunPython.noop),
+    ]
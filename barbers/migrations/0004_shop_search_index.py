@@ -0,0 +1,41 @@
+# Full-text search index for shops (SQLite FTS5; no-op on other databases)
+
+from django.db import migrations
+
+FTS_TABLE = 'barbers_shop_fts'
+
+
+def create_fts(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if not cursor.fetchone()[0]:
+            return
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "name, address, description, services, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, address, description, services) "
+            "SELECT s.id, s.name, s.address, s.description, "
+            "COALESCE((SELECT group_concat(v.name, ' ') FROM barbers_service v WHERE v.barber_shop_id = s.id), '') "
+            "FROM barbers_barbershop s"
+        )
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbers', '0003_barbershop_grid_cell'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
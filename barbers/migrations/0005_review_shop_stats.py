@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:47
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_stats(apps, schema_editor):
+    # No reviews exist yet; services and completed appointments come from their tables.
+    from django.db.models import Count, Max, Min
+    BarberShop = apps.get_model('barbers', 'BarberShop')
+    Service = apps.get_model('barbers', 'Service')
+    ShopStats = apps.get_model('barbers', 'ShopStats')
+    Appointment = apps.get_model('appointments', 'Appointment')
+    stats = {pk: ShopStats(barber_shop_id=pk) for pk in BarberShop.objects.values_list('pk', flat=True)}
+    for row in Service.objects.values('barber_shop_id').annotate(
+        count=Count('id'), low=Min('price'), high=Max('price')
+    ):
+        row_stats = stats[row['barber_shop_id']]
+        row_stats.service_count, row_stats.min_price, row_stats.max_price = row['count'], row['low'], row['high']
+    for shop_id, count in Appointment.objects.filter(status='COMPLETED').values('barber_shop_id').annotate(
+        count=Count('id')
+    ).values_list('barber_shop_id', 'count'):
+        stats[shop_id].completed_appointments = count
+    ShopStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_appointment_hot_path_indexes'),
+        ('authentication', '0001_initial'),
+        ('barbers', '0004_shop_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShopStats',
+            fields=[
+                ('barber_shop', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='barbers.barbershop')),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('service_count', models.PositiveIntegerField(default=0)),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=8, null=True)),
+                ('completed_appointments', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Shop stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='Review',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('comment', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('barber_shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='barbers.barbershop')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='authentication.profile')),
+            ],
+            options={
+                'ordering': ['-updated_at'],
+                'unique_together': {('barber_shop', 'customer')},
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbers', '0005_review_shop_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='barbershop',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
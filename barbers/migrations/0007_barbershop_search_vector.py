@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:47
+# Stored search document for PostgreSQL, GIN-indexed (the index and the
+# initial fill are no-ops on other databases, which search with FTS5 or LIKE).
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+INDEX = 'shop_search_vector_gin'
+# Same document as barbers.search.PostgresBackend builds: name A, services B, address C, description D.
+FILL = (
+    "UPDATE barbers_barbershop s SET search_vector = "
+    "setweight(to_tsvector(COALESCE(s.name, '')), 'A') || "
+    "setweight(to_tsvector(COALESCE((SELECT string_agg(v.name, ' ') FROM barbers_service v "
+    "WHERE v.barber_shop_id = s.id), '')), 'B') || "
+    "setweight(to_tsvector(COALESCE(s.address, '')), 'C') || "
+    "setweight(to_tsvector(COALESCE(s.description, '')), 'D')"
+)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(FILL)
+    schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {INDEX} ON barbers_barbershop USING gin (search_vector)')
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbers', '0006_barbershop_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='barbershop',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_index, drop_index),
+    ]
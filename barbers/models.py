@@ -1,8 +1,11 @@
 """
-Barber models - BarberShop, Service, WorkingHours
+Barber models - BarberShop, Service, WorkingHours, Review, ShopStats
 """
+from django.contrib.postgres.search import SearchVectorField
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from authentication.models import Profile
+from trimtrove.thumbnails import Thumbs
 
 
 class BarberShop(models.Model):
@@ -13,8 +16,15 @@ class BarberShop(models.Model):
     # For "nearby" feature - lat/lng (India coordinates)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    # Grid cell of (latitude, longitude), maintained in save() - see barbers.geo
+    grid_row = models.IntegerField(null=True, blank=True, editable=False)
+    grid_col = models.IntegerField(null=True, blank=True, editable=False)
     phone = models.CharField(max_length=15, blank=True)
     image = models.ImageField(upload_to='shops/', blank=True, null=True)
+    # Resized variants of `image`, written by trimtrove.thumbnails
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # PostgreSQL search document (GIN-indexed), written by barbers.search; unused elsewhere.
+    search_vector = SearchVectorField(null=True, editable=False)
     created_by = models.ForeignKey(
         Profile,
         on_delete=models.CASCADE,
@@ -25,14 +35,41 @@ class BarberShop(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Customer dashboard change feed polls on updated_at.
+            models.Index(fields=['updated_at'], name='shop_updated_at_idx'),
+            # Nearby search: grid cell range, then exact lat/lng box.
+            models.Index(fields=['grid_row', 'grid_col', 'latitude', 'longitude'], name='shop_grid_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def assign_grid_cell(self):
+        """Set grid_row/grid_col from the coordinates (call before bulk_create)."""
+        from .geo import grid_cell
+        if self.latitude is None or self.longitude is None:
+            self.grid_row = self.grid_col = None
+        else:
+            self.grid_row, self.grid_col = grid_cell(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        self.assign_grid_cell()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'grid_row', 'grid_col'}
+        super().save(*args, **kwargs)
+
+    @property
+    def image_thumbs(self):
+        """srcset helper for `image`; falls back to the original until variants exist."""
+        return Thumbs(self.image, self.image_variants)
+
     @property
     def avg_rating(self):
-        """Average rating - placeholder for future Review model."""
-        return 4.5
+        """Average review rating, or None before the first review (select_related('stats') on lists)."""
+        stats = getattr(self, 'stats', None)
+        return stats.avg_rating if stats else None
 
 
 class Service(models.Model):
@@ -86,3 +123,58 @@ class WorkingHours(models.Model):
         if self.is_closed:
             return f"{self.get_day_of_week_display()} - Closed"
         return f"{self.get_day_of_week_display()} - {self.start_time} to {self.end_time}"
+
+
+class Review(models.Model):
+    """A customer's rating of a shop - one per customer per shop, editable."""
+    barber_shop = models.ForeignKey(
+        BarberShop,
+        on_delete=models.CASCADE,
+        related_name='reviews'
+    )
+    customer = models.ForeignKey(
+        Profile,
+        on_delete=models.CASCADE,
+        related_name='reviews'
+    )
+    rating = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
+    comment = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-updated_at']
+        unique_together = [['barber_shop', 'customer']]
+
+    def __str__(self):
+        return f"{self.barber_shop} - {self.rating}/5 by {self.customer}"
+
+
+class ShopStats(models.Model):
+    """
+    Denormalised per-shop counters read by every shop card. Kept current on
+    write by barbers.stats; `manage.py reconcile_shop_stats` rebuilds them.
+    """
+    barber_shop = models.OneToOneField(
+        BarberShop,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    service_count = models.PositiveIntegerField(default=0)
+    min_price = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    max_price = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
+    completed_appointments = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Shop stats'
+
+    def __str__(self):
+        return f"Stats for {self.barber_shop}"
+
+    @property
+    def avg_rating(self):
+        return round(self.rating_sum / self.rating_count, 1) if self.rating_count else None
@@ -0,0 +1,175 @@
+"""
+Shop search - full-text index over shop name, address, description and services
+
+Backends are picked by database vendor:
+- SQLite: an FTS5 virtual table (barbers_shop_fts, rowid = shop id)
+  kept in sync by barbers.signals and ranked with bm25().
+- PostgreSQL: a stored BarberShop.search_vector (GIN index, migration
+  barbers 0007) kept in sync by the same signals, ranked with ts_rank.
+- Anything else: the old icontains scan, extended to service names.
+Bulk writes that skip signals should call get_backend().rebuild().
+"""
+import re
+
+from django.db import connection
+from django.db.models import F, OuterRef, Q, Subquery
+
+from .models import BarberShop, Service
+
+FTS_TABLE = 'barbers_shop_fts'
+# Results shown for a search; ranking makes the long tail irrelevant.
+SEARCH_LIMIT = 100
+# bm25 column weights: name, address, description, services.
+BM25_WEIGHTS = (10.0, 4.0, 1.0, 5.0)
+
+
+def _document(shop_ids):
+    """{shop_id: (name, address, description, services)} for some shops."""
+    docs = {
+        pk: [name, address, description, []]
+        for pk, name, address, description in BarberShop.objects.filter(pk__in=shop_ids).values_list(
+            'pk', 'name', 'address', 'description'
+        )
+    }
+    for shop_id, name in Service.objects.filter(barber_shop_id__in=docs).values_list('barber_shop_id', 'name'):
+        docs[shop_id][3].append(name)
+    return {pk: (name, address, description, ' '.join(services))
+            for pk, (name, address, description, services) in docs.items()}
+
+
+class LikeBackend:
+    """Unindexed fallback: substring match, no ranking."""
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        matches = BarberShop.objects.filter(
+            Q(name__icontains=query) | Q(address__icontains=query) | Q(services__name__icontains=query)
+        ).values_list('pk', flat=True).distinct()
+        return list(matches[:limit])
+
+    def index_shops(self, shop_ids):
+        pass
+
+    def remove_shops(self, shop_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+
+class SqliteFtsBackend:
+    """FTS5 virtual table maintained incrementally."""
+
+    @staticmethod
+    def to_match(query):
+        # Quote every word so user input can't inject FTS syntax; the last
+        # word is a prefix match so results update while typing.
+        words = re.findall(r'\w+', query)
+        if not words:
+            return None
+        terms = [f'"{word}"' for word in words]
+        terms[-1] += '*'
+        return ' '.join(terms)
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        match = self.to_match(query)
+        if match is None:
+            return []
+        weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s',
+                [match, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def index_shops(self, shop_ids):
+        shop_ids = list(shop_ids)
+        docs = _document(shop_ids)
+        with connection.cursor() as cursor:
+            self._delete(cursor, shop_ids)
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, address, description, services) VALUES (%s, %s, %s, %s, %s)',
+                [(pk, *doc) for pk, doc in docs.items()],
+            )
+
+    def remove_shops(self, shop_ids):
+        with connection.cursor() as cursor:
+            self._delete(cursor, list(shop_ids))
+
+    def _delete(self, cursor, shop_ids):
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in shop_ids])
+
+    def rebuild(self, batch_size=2000):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        ids = list(BarberShop.objects.values_list('pk', flat=True))
+        for start in range(0, len(ids), batch_size):
+            self.index_shops(ids[start:start + batch_size])
+
+
+class PostgresBackend:
+    """Stored, GIN-indexed tsvector maintained incrementally."""
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        query = SearchQuery(query, search_type='websearch')
+        matches = BarberShop.objects.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query),
+        ).order_by('-rank', 'pk').values_list('pk', flat=True)
+        return list(matches[:limit])
+
+    def index_shops(self, shop_ids):
+        from django.contrib.postgres.aggregates import StringAgg
+        from django.contrib.postgres.search import SearchVector
+        services = Service.objects.filter(barber_shop=OuterRef('pk')).values('barber_shop').annotate(
+            names=StringAgg('name', delimiter=' '),
+        ).values('names')
+        # Weights: name A, services B, address C, description D.
+        BarberShop.objects.filter(pk__in=list(shop_ids)).update(search_vector=(
+            SearchVector('name', weight='A')
+            + SearchVector(Subquery(services), weight='B')
+            + SearchVector('address', weight='C')
+            + SearchVector('description', weight='D')
+        ))
+
+    def remove_shops(self, shop_ids):
+        # The vector lives on the shop row and goes with it.
+        pass
+
+    def rebuild(self, batch_size=2000):
+        ids = list(BarberShop.objects.values_list('pk', flat=True))
+        for start in range(0, len(ids), batch_size):
+            self.index_shops(ids[start:start + batch_size])
+
+
+_fts_ready = False
+
+
+def fts5_available():
+    """Whether the FTS5 table exists (created by migration barbers 0004 when SQLite supports it)."""
+    global _fts_ready
+    if connection.vendor != 'sqlite':
+        return False
+    if not _fts_ready:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            # Only a positive answer is cached; the table never goes away once migrated.
+            _fts_ready = cursor.fetchone() is not None
+    return _fts_ready
+
+
+def get_backend():
+    if connection.vendor == 'postgresql':
+        return PostgresBackend()
+    if fts5_available():
+        return SqliteFtsBackend()
+    return LikeBackend()
+
+
+def search_shops(query, limit=SEARCH_LIMIT):
+    """Shops matching `query`, most relevant first."""
+    ids = get_backend().search(query, limit)
+    shops = BarberShop.objects.filter(pk__in=ids).select_related('stats')
+    order = {pk: i for i, pk in enumerate(ids)}
+    return sorted(shops, key=lambda shop: order[shop.pk])
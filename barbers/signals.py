@@ -0,0 +1,92 @@
+"""
+Barber signals - touch the parent shop when its services or hours change,
+keep the shop search index and shop stats current, thumbnail new shop images
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from trimtrove import thumbnails
+from . import changes, search, stats
+from .models import BarberShop, Review, Service, ShopStats, WorkingHours
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+def touch_shop(sender, instance, raw=False, **kwargs):
+    """
+    Keep BarberShop.updated_at the newest change to anything shown on its
+    pages, so HTTP validators and the dashboard feed only need the shop row.
+    """
+    if raw:
+        return
+    BarberShop.objects.filter(pk=instance.barber_shop_id).update(updated_at=timezone.now())
+    changes.mark_changed()
+
+
+@receiver(post_save, sender=BarberShop)
+def mark_shop_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        changes.mark_changed()
+
+
+@receiver(post_save, sender=BarberShop)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def reindex_shop(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    shop_id = instance.pk if sender is BarberShop else instance.barber_shop_id
+    search.get_backend().index_shops([shop_id])
+
+
+@receiver(post_delete, sender=BarberShop)
+def unindex_shop(sender, instance, **kwargs):
+    search.get_backend().remove_shops([instance.pk])
+
+
+@receiver(post_save, sender=BarberShop)
+def build_image_variants(sender, instance, raw=False, **kwargs):
+    if not raw and instance.image and not thumbnails.is_current(instance.image, instance.image_variants):
+        thumbnails.schedule(instance, 'image', 'image_variants')
+
+
+@receiver(post_save, sender=BarberShop)
+def create_shop_stats(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        ShopStats.objects.get_or_create(barber_shop=instance)
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def update_service_stats(sender, instance, raw=False, origin=None, **kwargs):
+    # Nothing to keep up to date when the whole shop is being deleted.
+    if raw or isinstance(origin, BarberShop):
+        return
+    stats.refresh_services(instance.barber_shop_id)
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance, raw=False, **kwargs):
+    instance._previous_rating = None
+    if instance.pk and not raw:
+        instance._previous_rating = Review.objects.filter(pk=instance.pk).values_list('rating', flat=True).first()
+
+
+@receiver(post_save, sender=Review)
+def count_review(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_rating', None)
+    if created or previous is None:
+        stats.add_rating(instance.barber_shop_id, instance.rating)
+    elif previous != instance.rating:
+        stats.add_rating(instance.barber_shop_id, instance.rating - previous, count=0)
+
+
+@receiver(post_delete, sender=Review)
+def uncount_review(sender, instance, origin=None, **kwargs):
+    if not isinstance(origin, BarberShop):
+        stats.add_rating(instance.barber_shop_id, -instance.rating, count=-1)
@@ -0,0 +1,118 @@
+"""
+Shop stats - denormalised ShopStats rows behind every shop card
+
+Rows are written incrementally: review and completion changes apply F()
+deltas, service changes re-aggregate that one shop's services. Cards and
+HTTP validators key off BarberShop.updated_at, so rating writes also
+touch the shop; completion counts are not on any customer page, so
+finishing an appointment leaves the shop alone. Bulk writes that skip signals (bulk_create, update())
+should call reconcile() for the shops they touched.
+"""
+from django.db.models import Count, F, Max, Min, Sum
+from django.utils import timezone
+
+from appointments.models import Appointment, ArchivedAppointment
+from . import changes
+from .models import BarberShop, Review, Service, ShopStats
+
+EMPTY = {
+    'rating_sum': 0,
+    'rating_count': 0,
+    'service_count': 0,
+    'min_price': None,
+    'max_price': None,
+    'completed_appointments': 0,
+}
+FIELDS = tuple(EMPTY)
+
+
+def _apply(shop_id, touch=True, **changes):
+    # A missing row (shop bulk-created without signals) is left for reconcile().
+    now = timezone.now()
+    ShopStats.objects.filter(barber_shop_id=shop_id).update(updated_at=now, **changes)
+    if touch:
+        BarberShop.objects.filter(pk=shop_id).update(updated_at=now)
+        changes.mark_changed()
+
+
+def add_rating(shop_id, rating, count=1):
+    """Add `rating` to the shop's rating sum and `count` to its review count (both may be negative)."""
+    _apply(shop_id, rating_sum=F('rating_sum') + rating, rating_count=F('rating_count') + count)
+
+
+def add_completed(shop_id, count=1):
+    _apply(shop_id, touch=False, completed_appointments=F('completed_appointments') + count)
+
+
+def refresh_services(shop_id):
+    """Re-aggregate one shop's services (service writes touch the shop themselves)."""
+    services = _service_stats(Service.objects.filter(barber_shop_id=shop_id)).get(shop_id) or {
+        'service_count': 0, 'min_price': None, 'max_price': None,
+    }
+    _apply(shop_id, touch=False, **services)
+
+
+def _service_stats(services):
+    return {
+        row.pop('barber_shop_id'): row
+        for row in services.values('barber_shop_id').annotate(
+            service_count=Count('id'), min_price=Min('price'), max_price=Max('price')
+        )
+    }
+
+
+def compute(shop_ids=None):
+    """{shop_id: {field: value}} recomputed from Service, Review and (hot and archived) appointments."""
+    def scoped(queryset, field='barber_shop_id'):
+        return queryset if shop_ids is None else queryset.filter(**{f'{field}__in': shop_ids})
+
+    stats = {pk: dict(EMPTY) for pk in scoped(BarberShop.objects.all(), 'pk').values_list('pk', flat=True)}
+    sources = [
+        _service_stats(scoped(Service.objects.all())),
+        {row.pop('barber_shop_id'): row for row in scoped(Review.objects.all()).values('barber_shop_id').annotate(
+            rating_sum=Sum('rating'), rating_count=Count('id'))},
+    ]
+    for source in sources:
+        for shop_id, values in source.items():
+            if shop_id in stats:
+                stats[shop_id].update(values)
+    for model in (Appointment, ArchivedAppointment):
+        completed = scoped(model.objects.filter(status=Appointment.Status.COMPLETED))
+        for row in completed.values('barber_shop_id').annotate(count=Count('id')):
+            if row['barber_shop_id'] in stats:
+                stats[row['barber_shop_id']]['completed_appointments'] += row['count']
+    return stats
+
+
+def drift(shop_ids=None):
+    """(expected, missing_ids, stale_ids) comparing stored rows with compute()."""
+    expected = compute(shop_ids)
+    stored = ShopStats.objects.all()
+    if shop_ids is not None:
+        stored = stored.filter(barber_shop_id__in=shop_ids)
+    stored = {row['barber_shop_id']: row for row in stored.values('barber_shop_id', *FIELDS)}
+    missing = [pk for pk in expected if pk not in stored]
+    stale = [
+        pk for pk, values in expected.items()
+        if pk in stored and any(stored[pk][f] != values[f] for f in FIELDS)
+    ]
+    return expected, missing, stale
+
+
+def reconcile(shop_ids=None, batch_size=1000):
+    """Rewrite missing or wrong ShopStats rows from the source tables; returns the shop ids fixed."""
+    expected, missing, stale = drift(shop_ids)
+    ShopStats.objects.bulk_create(
+        [ShopStats(barber_shop_id=pk, **expected[pk]) for pk in missing],
+        batch_size=batch_size, ignore_conflicts=True,
+    )
+    ShopStats.objects.bulk_update(
+        [ShopStats(barber_shop_id=pk, updated_at=timezone.now(), **expected[pk]) for pk in stale],
+        (*FIELDS, 'updated_at'), batch_size=batch_size,
+    )
+    fixed = missing + stale
+    for start in range(0, len(fixed), batch_size):
+        BarberShop.objects.filter(pk__in=fixed[start:start + batch_size]).update(updated_at=timezone.now())
+    if fixed:
+        changes.mark_changed()
+    return fixed
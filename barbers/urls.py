@@ -14,4 +14,5 @@ urlpatterns = [
     path('shop/<int:shop_id>/services/<int:pk>/delete/', views.service_delete, name='service_delete'),
     path('shop/<int:shop_id>/availability/', views.availability, name='availability'),
     path('appointments/', views.appointments, name='appointments'),
+    path('analytics/', views.analytics, name='analytics'),
 ]
@@ -1,27 +1,37 @@
 """
-Barber views - Dashboard, services, availability, appointments
+Barber views - Dashboard, services, availability, appointments, analytics
 """
+from datetime import date, timedelta
+
 from django.shortcuts import render, redirect, get_object_or_404
+from django.utils.dateparse import parse_date
 from django.contrib.auth.decorators import login_required
 
 from authentication.decorators import barber_required
 from .models import BarberShop, Service, WorkingHours
 from .forms import BarberShopForm, ServiceForm, WorkingHoursFormSet
-from appointments.models import Appointment
+from appointments import rollups
+from appointments.models import Appointment, ArchivedAppointment, DailyRollup
+from appointments.pagination import render_keyset_page
+
+# Longer analytics ranges are broken down by month instead of by day.
+MAX_DAILY_DAYS = 62
 
 
 @barber_required
 def dashboard(request):
     """Barber dashboard - overview of shop and appointments."""
     profile = request.user.profile
-    shops = BarberShop.objects.filter(created_by=profile).prefetch_related('services')
-    # Today's and upcoming appointments across all shops
-    from django.utils import timezone
-    appointments = Appointment.objects.filter(
-        barber_shop__created_by=profile
-    ).exclude(status__in=['CANCELLED', 'REJECTED']).select_related(
+    shops = list(BarberShop.objects.filter(created_by=profile).select_related('stats'))
+    # Today's and upcoming appointments across all shops: the first 20 of
+    # each shop's index order, merged, so no query sorts a whole history.
+    upcoming = Appointment.objects.exclude(status__in=['CANCELLED', 'REJECTED']).select_related(
         'customer__user', 'service', 'barber_shop'
-    ).order_by('date', 'start_time')[:20]
+    ).order_by('date', 'start_time')
+    appointments = sorted(
+        (apt for shop in shops for apt in upcoming.filter(barber_shop_id=shop.pk)[:20]),
+        key=lambda apt: (apt.date, apt.start_time),
+    )[:20]
     return render(request, 'barbers/dashboard.html', {
         'shops': shops,
         'appointments': appointments,
@@ -132,9 +142,50 @@ def availability(request, shop_id):
 
 @barber_required
 def appointments(request):
-    """View and manage appointments."""
+    """View and manage appointments (archived ones included), newest first, paged by cursor."""
     profile = request.user.profile
+    # One keyset scan per shop (see appointments.pagination).
+    shop_ids = list(BarberShop.objects.filter(created_by=profile).values_list('pk', flat=True))
     appointments_list = Appointment.objects.filter(
-        barber_shop__created_by=profile
-    ).select_related('customer__user', 'service', 'barber_shop').order_by('-date', '-start_time')
-    return render(request, 'barbers/appointments.html', {'appointments': appointments_list})
+        barber_shop_id__in=shop_ids
+    ).select_related('customer__user', 'service', 'barber_shop')
+    archived = ArchivedAppointment.objects.filter(
+        barber_shop_id__in=shop_ids
+    ).select_related('customer__user', 'service', 'barber_shop')
+    return render_keyset_page(
+        request, 'barbers/appointments.html', 'barbers/_appointment_rows.html', appointments_list,
+        archive=archived, shop_ids=shop_ids,
+    )
+
+
+def _date_param(request, name):
+    try:
+        return parse_date(request.GET.get(name, ''))
+    except ValueError:
+        return None
+
+
+@barber_required
+def analytics(request):
+    """Bookings, revenue and utilization for a date range, read from the daily rollups only."""
+    profile = request.user.profile
+    shops = BarberShop.objects.filter(created_by=profile).only('pk', 'name').order_by('name')
+    end = _date_param(request, 'end') or date.today()
+    start = _date_param(request, 'start') or end - timedelta(days=29)
+    if start > end:
+        start, end = end, start
+    rows = DailyRollup.objects.filter(barber_shop__created_by=profile, date__range=(start, end))
+    shop = None
+    if request.GET.get('shop', '').isdigit():
+        shop = get_object_or_404(shops, pk=request.GET['shop'])
+        rows = rows.filter(barber_shop=shop)
+    period = 'day' if (end - start).days < MAX_DAILY_DAYS else 'month'
+    return render(request, 'barbers/analytics.html', {
+        'shops': shops,
+        'shop': shop,
+        'start': start,
+        'end': end,
+        'period': period,
+        'totals': rollups.summarize(rows),
+        'periods': rollups.by_period(rows, period),
+    })
@@ -1,6 +1,8 @@
-"""Customer forms - Booking"""
+"""Customer forms - Booking, Review"""
 from django import forms
 from appointments.models import Appointment
+from barbers.models import Review
+from appointments.booking import check_slot
 
 
 class BookingForm(forms.ModelForm):
@@ -8,6 +10,7 @@ class BookingForm(forms.ModelForm):
 
     def __init__(self, shop=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.shop = shop
         if shop:
             self.fields['service'].queryset = shop.services.all()
             self.fields['service'].widget.attrs.update({'class': 'form-input'})
@@ -18,3 +21,30 @@ class BookingForm(forms.ModelForm):
     class Meta:
         model = Appointment
         fields = ('service', 'date', 'start_time', 'notes')
+
+    def clean(self):
+        cleaned = super().clean()
+        service = cleaned.get('service')
+        target_date = cleaned.get('date')
+        start_time = cleaned.get('start_time')
+        if self.shop and service and target_date and start_time:
+            error = check_slot(self.shop, service, target_date, start_time)
+            if error:
+                raise forms.ValidationError(error)
+        return cleaned
+
+
+class ReviewForm(forms.ModelForm):
+    """Form to rate a shop."""
+    rating = forms.TypedChoiceField(
+        choices=[(n, '⭐' * n) for n in range(5, 0, -1)],
+        coerce=int,
+        widget=forms.Select(attrs={'class': 'form-input'}),
+    )
+
+    class Meta:
+        model = Review
+        fields = ('rating', 'comment')
+        widgets = {
+            'comment': forms.Textarea(attrs={'class': 'form-input', 'rows': 3, 'placeholder': 'Optional comment'}),
+        }
@@ -0,0 +1,48 @@
+"""
+Shop fragment cache - rendered shop cards and shop detail bodies
+
+Fragments are keyed on the shop id and BarberShop.updated_at, which acts
+as the shop's version: saving the shop, any Service/WorkingHours write
+and every rating change bump it (see barbers.signals, barbers.stats), so
+a changed shop simply misses and old fragments expire on their own.
+Only shop data goes into a fragment; anything that depends on the viewer
+or the request (nav, messages, reviews, distances) stays outside.
+"""
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+FRAGMENT_TIMEOUT = 60 * 60
+# Bump when a cached template changes, so a deploy doesn't serve old markup.
+FRAGMENT_VERSION = 3
+
+
+def fragment_key(template_name, shop):
+    return f'frag:{FRAGMENT_VERSION}:{template_name}:{shop.pk}:{shop.updated_at.timestamp()}'
+
+
+def render_shop_fragments(shops, template_name):
+    """Rendered `template_name` for each shop (context: {'shop': shop}), one cache round trip for all."""
+    shops = list(shops)
+    keys = [fragment_key(template_name, shop) for shop in shops]
+    cached = cache.get_many(keys)
+    missing = {}
+    fragments = []
+    for shop, key in zip(shops, keys):
+        html = cached.get(key)
+        if html is None:
+            html = missing[key] = render_to_string(template_name, {'shop': shop})
+        fragments.append(mark_safe(html))
+    if missing:
+        cache.set_many(missing, FRAGMENT_TIMEOUT)
+    return fragments
+
+
+def render_shop_cards(shops, template_name='customers/_shop_card.html'):
+    """Shop cards for a list page; select_related('stats') on `shops`."""
+    return render_shop_fragments(shops, template_name)
+
+
+def render_shop_detail(shop):
+    """Header, services and opening hours of the shop detail page."""
+    return render_shop_fragments([shop], 'customers/_shop_detail_body.html')[0]
@@ -0,0 +1,101 @@
+"""
+Query-count check: revalidated customer pages answer 304 from the validator query alone.
+Run: python manage.py check_conditional_requests
+
+Signs in a throwaway customer (inside a transaction that is rolled back),
+loads each page guarded by condition() once for its ETag and
+Last-Modified, then repeats the request with If-None-Match and with
+If-Modified-Since. Each repeat must return 304 after one query besides
+the session, user and Profile lookups every signed-in request makes: the
+BarberShop validator query. A shop write must turn the next repeat back
+into a full 200, as must a queued flash message. Every page must also
+send Cache-Control: private, no-cache so browsers always revalidate.
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from authentication.models import Profile
+from barbers.models import BarberShop
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Fail if a 304 response on a customer page runs more than the validator query'
+
+    # Per-request auth overhead, not part of the view's own work.
+    auth_tables = re.compile(
+        rf'FROM "?(django_session|{User._meta.db_table}|{Profile._meta.db_table})"?(?:\s|$)'
+    )
+    validator = re.compile(rf'FROM "?{BarberShop._meta.db_table}"?(?:\s|$)')
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=['*']):
+            customer, shop = self._seed()
+            client = Client()
+            client.force_login(customer)
+            pages = [
+                ('customer dashboard', reverse('customers:dashboard')),
+                ('shop list', reverse('customers:shops')),
+                ('shop detail', reverse('customers:shop_detail', args=[shop.pk])),
+            ]
+            for label, url in pages:
+                first = client.get(url)
+                cache_control = {part.strip() for part in first.get('Cache-Control', '').split(',')}
+                if first.status_code != 200 or not first.has_header('ETag') or not {'private', 'no-cache'} <= cache_control:
+                    self.stdout.write(self.style.ERROR(
+                        f'{label:<34} {first.status_code}, ETag {first.get("ETag")}, '
+                        f'Cache-Control {first.get("Cache-Control")}  FAIL'
+                    ))
+                    failures.append(label)
+                    continue
+                for header, value in (('If-None-Match', first['ETag']),
+                                      ('If-Modified-Since', first['Last-Modified'])):
+                    if not self._check(f'{label} ({header})', client, url, {header: value}, 304):
+                        failures.append(f'{label} ({header})')
+                # Any shop write bumps the validators.
+                BarberShop.objects.filter(pk=shop.pk).update(updated_at=timezone.now())
+                if not self._check(f'{label} (after a write)', client, url, {'If-None-Match': first['ETag']}, 200):
+                    failures.append(f'{label} (after a write)')
+
+            # review_shop refuses (no completed visit) and redirects with an error message.
+            url = reverse('customers:shop_detail', args=[shop.pk])
+            etag = client.get(url)['ETag']
+            client.get(reverse('customers:review', args=[shop.pk]))
+            if not self._check('shop detail (queued message)', client, url, {'If-None-Match': etag}, 200):
+                failures.append('shop detail (queued message)')
+            transaction.set_rollback(True)
+        if failures:
+            raise CommandError(f'{len(failures)} conditional request check(s) failed: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('Revalidated pages answer 304 from the validator query alone.'))
+
+    def _check(self, label, client, url, headers, expected_status):
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(url, headers=headers)
+        own = [q['sql'] for q in captured.captured_queries if not self.auth_tables.search(q['sql'])]
+        if expected_status == 304:
+            ok = response.status_code == 304 and len(own) == 1 and bool(self.validator.search(own[0]))
+        else:
+            ok = response.status_code == 200
+        status = self.style.SUCCESS('ok') if ok else self.style.ERROR('FAIL')
+        self.stdout.write(f'{label:<48} {response.status_code}  view queries {len(own)}  {status}')
+        if not ok and expected_status == 304:
+            for sql in own:
+                self.stdout.write(f'    {sql[:160]}')
+        return ok
+
+    def _seed(self):
+        customer = User.objects.create(username='conditional-check-customer@trimtrove.local')
+        Profile.objects.create(user=customer, role=Profile.Role.CUSTOMER)
+        barber = User.objects.create(username='conditional-check-barber@trimtrove.local')
+        owner = Profile.objects.create(user=barber, role=Profile.Role.BARBER)
+        shop = BarberShop.objects.create(name='Conditional check shop', address='-', created_by=owner)
+        return customer, shop
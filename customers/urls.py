@@ -6,8 +6,12 @@ app_name = 'customers'
 
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
+    path('feed/', views.shop_feed, name='shop_feed'),
+    path('nearby/', views.nearby, name='nearby'),
+    path('api/nearby/', views.nearby_api, name='nearby_api'),
     path('shops/', views.shop_list, name='shops'),
     path('shop/<int:pk>/', views.shop_detail, name='shop_detail'),
+    path('shop/<int:shop_id>/review/', views.review_shop, name='review'),
     path('book/<int:shop_id>/', views.book_appointment, name='book'),
     path('appointments/', views.appointments, name='appointments'),
 ]
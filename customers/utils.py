@@ -0,0 +1,69 @@
+"""
+Customer utilities - HTTP validators (ETag / Last-Modified) for read views
+
+Service and WorkingHours writes touch BarberShop.updated_at (see
+barbers.signals), as do rating changes (see barbers.stats), so
+the newest shop timestamp plus the shop count
+covers every change that can alter a customer page. Validators are
+computed once per request and shared by the ETag and Last-Modified
+callbacks of django.views.decorators.http.condition. A request with
+queued flash messages gets no validators, so it always renders the page
+(and its messages) in full.
+"""
+import hashlib
+
+from django.contrib import messages
+from django.db.models import Count, Max
+
+from barbers.models import BarberShop
+
+
+# Validators of a request that must not be answered 304.
+NO_STATE = {'last_modified': None, 'shops': 0}
+
+
+def _has_messages(request):
+    # len() loads the stored messages without marking them as shown.
+    return bool(len(messages.get_messages(request)))
+
+
+def _catalog_state(request):
+    if not hasattr(request, '_catalog_state'):
+        request._catalog_state = NO_STATE if _has_messages(request) else BarberShop.objects.aggregate(
+            last_modified=Max('updated_at'), shops=Count('id')
+        )
+    return request._catalog_state
+
+
+def _shop_state(request, pk):
+    if not hasattr(request, '_shop_state'):
+        request._shop_state = NO_STATE if _has_messages(request) else {
+            'last_modified': BarberShop.objects.filter(pk=pk).values_list('updated_at', flat=True).first(),
+            'shops': 1,
+        }
+    return request._shop_state
+
+
+def _etag(request, state):
+    # Pages embed the viewer's nav/role, so the tag is per user.
+    stamp = state['last_modified'].isoformat() if state['last_modified'] else '-'
+    raw = f"{request.user.pk}:{state['shops']}:{stamp}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def catalog_etag(request, *args, **kwargs):
+    state = _catalog_state(request)
+    return None if state is NO_STATE else _etag(request, state)
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    return _catalog_state(request)['last_modified']
+
+
+def shop_etag(request, pk, *args, **kwargs):
+    state = _shop_state(request, pk)
+    return _etag(request, state) if state['last_modified'] else None
+
+
+def shop_last_modified(request, pk, *args, **kwargs):
+    return _shop_state(request, pk)['last_modified']
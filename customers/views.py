@@ -1,42 +1,211 @@
 """
-Customer views - Dashboard, shops, booking, appointment history
+Customer views - Dashboard, shop change feed, nearby shops, shops, reviews, booking, appointment history
 """
-from datetime import date, timedelta
+import asyncio
+from datetime import date, datetime, timedelta
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, HttpResponseNotAllowed
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
-from authentication.decorators import customer_required
-from barbers.models import BarberShop, Service
-from appointments.models import Appointment
-from appointments.utils import get_available_slots
-from .forms import BookingForm
+from authentication.decorators import customer_required, async_customer_required
+from barbers.models import BarberShop, Review, Service
+from barbers import changes, geo, search
+from appointments.models import Appointment, ArchivedAppointment
+from appointments.utils import BOOKING_WINDOW_DAYS, get_available_slots
+from appointments.booking import place_booking, SlotUnavailable
+from appointments.pagination import render_keyset_page
+from .forms import BookingForm, ReviewForm
+from .fragments import render_shop_cards, render_shop_detail
+from .utils import catalog_etag, catalog_last_modified, shop_etag, shop_last_modified
 
 
 @customer_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
 def dashboard(request):
     """Customer dashboard - nearby barber shops."""
-    shops = BarberShop.objects.all().select_related('created_by').prefetch_related('services')
-    return render(request, 'customers/dashboard.html', {'shops': shops})
+    shops = list(BarberShop.objects.all().select_related('stats'))
+    # The change feed resumes from the newest card rendered here.
+    feed_cursor = max((shop.updated_at for shop in shops), default=timezone.now())
+    return render(request, 'customers/dashboard.html', {
+        'cards': render_shop_cards(shops),
+        'feed_cursor': feed_cursor.isoformat(),
+    })
+
+
+# Long-poll: hold a feed request open this long, checking this often.
+FEED_TIMEOUT_SECONDS = 25
+FEED_POLL_SECONDS = 2
+# Under WSGI a held request would pin a worker thread: answer at once and
+# have the client come back after this long.
+FEED_SHORT_POLL_SECONDS = 15
+
+
+@async_customer_required
+async def shop_feed(request):
+    """
+    API: GET ?since=<ISO timestamp>
+    Long-polls for shops created/updated after `since` and returns their
+    rendered cards, the next cursor and `retry` (seconds the client waits
+    before polling again). Each request runs one indexed EXISTS query, then
+    waits on the shop change marker (barbers.changes), a cache read per
+    poll interval, and only queries again when it moves. Long-polling needs ASGI
+    (trimtrove.asgi); under WSGI the feed answers at once and the client
+    short-polls every FEED_SHORT_POLL_SECONDS.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        since = datetime.fromisoformat(request.GET['since'])
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'Invalid params'}, status=400)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+
+    long_poll = isinstance(request, ASGIRequest)
+    retry = 0 if long_poll else FEED_SHORT_POLL_SECONDS
+    changed = BarberShop.objects.filter(updated_at__gt=since)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (FEED_TIMEOUT_SECONDS if long_poll else 0)
+    # Read before the query, so a change committed after it still moves the token.
+    token = await changes.atoken()
+    while not await changed.aexists():
+        while (latest := await changes.atoken()) == token:
+            if loop.time() >= deadline:
+                return JsonResponse({'cursor': since.isoformat(), 'shops': [], 'retry': retry})
+            await asyncio.sleep(FEED_POLL_SECONDS)
+        token = latest
+    return JsonResponse({**await sync_to_async(_render_shop_cards)(changed), 'retry': retry})
+
+
+def _render_shop_cards(changed):
+    shops = list(changed.select_related('stats').order_by('updated_at'))
+    return {
+        'cursor': shops[-1].updated_at.isoformat(),
+        'shops': [{'id': shop.pk, 'html': card} for shop, card in zip(shops, render_shop_cards(shops))],
+    }
+
+
+def _nearby_params(request):
+    """(lat, lng, radius_km, k) from the query string; raises ValueError."""
+    lat = float(request.GET['lat'])
+    lng = float(request.GET['lng'])
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError('coordinates out of range')
+    radius = request.GET.get('radius')
+    radius = float(radius) if radius else None
+    k = int(request.GET.get('k', 20))
+    if (radius is not None and not 0 < radius <= geo.MAX_RADIUS_KM) or not 1 <= k <= geo.MAX_RESULTS:
+        raise ValueError('radius or k out of range')
+    return lat, lng, radius, k
+
+
+def _find_nearby(lat, lng, radius, k):
+    shops = BarberShop.objects.select_related('stats')
+    if radius is None:
+        return geo.k_nearest(shops, lat, lng, k)
+    return geo.nearby_shops(shops, lat, lng, radius, k)
+
+
+@customer_required
+def nearby(request):
+    """Shops near the customer, nearest first (?lat=&lng=[&radius=km][&k=])."""
+    shops = None
+    error = None
+    if 'lat' in request.GET:
+        try:
+            shops = _find_nearby(*_nearby_params(request))
+        except (KeyError, ValueError):
+            error = 'Could not read your location.'
+    return render(request, 'customers/nearby.html', {'shops': shops, 'error': error})
+
+
+@customer_required
+def nearby_api(request):
+    """
+    API: GET ?lat=12.97&lng=77.59[&radius=5][&k=20]
+    Without radius, returns the k nearest shops (searching up to MAX_RADIUS_KM).
+    """
+    try:
+        shops = _find_nearby(*_nearby_params(request))
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'Invalid params'}, status=400)
+    return JsonResponse({'shops': [
+        {
+            'id': shop.pk,
+            'name': shop.name,
+            'address': shop.address,
+            'latitude': float(shop.latitude),
+            'longitude': float(shop.longitude),
+            'distance_km': shop.distance_km,
+        }
+        for shop in shops
+    ]})
 
 
 @customer_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
 def shop_list(request):
     """List all barber shops with search/filter."""
     q = request.GET.get('q', '')
-    shops = BarberShop.objects.all().prefetch_related('services')
     if q:
-        shops = shops.filter(
-            Q(name__icontains=q) | Q(address__icontains=q)
-        )
-    return render(request, 'customers/shop_list.html', {'shops': shops, 'query': q})
+        # Full-text index over name, address, description and services, best match first.
+        shops = search.search_shops(q)
+    else:
+        shops = BarberShop.objects.all().select_related('stats')
+    cards = render_shop_cards(shops, 'customers/_shop_list_card.html')
+    return render(request, 'customers/shop_list.html', {'cards': cards, 'query': q})
+
+
+REVIEWS_SHOWN = 5
 
 
 @customer_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=shop_etag, last_modified_func=shop_last_modified)
 def shop_detail(request, pk):
-    """Barber shop detail with services and book button."""
-    shop = get_object_or_404(BarberShop.objects.prefetch_related('services', 'working_hours'), pk=pk)
-    return render(request, 'customers/shop_detail.html', {'shop': shop})
+    """Barber shop detail with services, opening hours, reviews and book button."""
+    shop = get_object_or_404(BarberShop.objects.select_related('stats'), pk=pk)
+    # Services and hours are only queried when the cached body is stale.
+    reviews = shop.reviews.select_related('customer__user')[:REVIEWS_SHOWN]
+    return render(request, 'customers/shop_detail.html', {
+        'shop': shop,
+        'shop_body': render_shop_detail(shop),
+        'reviews': reviews,
+    })
+
+
+@customer_required
+def review_shop(request, shop_id):
+    """Rate a shop after a completed appointment; submitting again edits the review."""
+    shop = get_object_or_404(BarberShop, pk=shop_id)
+    profile = request.user.profile
+    completed = {'customer': profile, 'barber_shop': shop, 'status': Appointment.Status.COMPLETED}
+    if not (Appointment.objects.filter(**completed).exists()
+            or ArchivedAppointment.objects.filter(**completed).exists()):
+        messages.error(request, 'You can review a shop after a completed appointment.')
+        return redirect('customers:shop_detail', pk=shop.pk)
+
+    review = Review.objects.filter(barber_shop=shop, customer=profile).first()
+    if request.method == 'POST':
+        form = ReviewForm(request.POST, instance=review)
+        if form.is_valid():
+            review = form.save(commit=False)
+            review.barber_shop = shop
+            review.customer = profile
+            review.save()
+            messages.success(request, 'Thanks for your review!')
+            return redirect('customers:shop_detail', pk=shop.pk)
+    else:
+        form = ReviewForm(instance=review)
+    return render(request, 'customers/review.html', {'shop': shop, 'form': form})
 
 
 @customer_required
@@ -51,8 +220,12 @@ def book_appointment(request, shop_id):
             appointment = form.save(commit=False)
             appointment.customer = profile
             appointment.barber_shop = shop
-            appointment.save()
-            return redirect('customers:appointments')
+            try:
+                place_booking(appointment)
+            except SlotUnavailable as e:
+                form.add_error(None, str(e))
+            else:
+                return redirect('customers:appointments')
     else:
         initial = {}
         if request.GET.get('service'):
@@ -65,7 +238,7 @@ def book_appointment(request, shop_id):
 
     # Min date = today
     min_date = date.today()
-    max_date = date.today() + timedelta(days=30)
+    max_date = date.today() + timedelta(days=BOOKING_WINDOW_DAYS)
     return render(request, 'customers/book.html', {
         'shop': shop,
         'form': form,
@@ -76,9 +249,13 @@ def book_appointment(request, shop_id):
 
 @customer_required
 def appointments(request):
-    """Customer appointment history."""
+    """Customer appointment history (archived ones included), newest first, paged by cursor."""
     profile = request.user.profile
     appointments_list = Appointment.objects.filter(
         customer=profile
-    ).select_related('barber_shop', 'service').order_by('-date', '-start_time')
-    return render(request, 'customers/appointments.html', {'appointments': appointments_list})
+    ).select_related('barber_shop', 'service')
+    archived = ArchivedAppointment.objects.filter(customer=profile).select_related('barber_shop', 'service')
+    return render_keyset_page(
+        request, 'customers/appointments.html', 'customers/_appointment_rows.html', appointments_list,
+        archive=archived,
+    )
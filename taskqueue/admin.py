@@ -0,0 +1,19 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'max_attempts', 'run_at', 'created_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('locked_by', 'locked_until', 'last_error', 'created_at', 'updated_at')
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected tasks now')
+    def retry_now(self, request, queryset):
+        count = queryset.exclude(status=Task.Status.RUNNING).update(
+            status=Task.Status.QUEUED, run_at=timezone.now(), attempts=0, locked_by='', locked_until=None
+        )
+        self.message_user(request, f'{count} task(s) queued.')
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TaskqueueConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'taskqueue'
+    verbose_name = 'Task queue'
+
+    def ready(self):
+        # Register the @task functions in every app's tasks.py.
+        autodiscover_modules('tasks')
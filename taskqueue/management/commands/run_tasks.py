@@ -0,0 +1,79 @@
+"""
+Run queued background tasks.
+Run: python manage.py run_tasks [--threads 4] [--batch 20] [--poll 1.0] [--once]
+
+Claims due tasks in batches of up to --batch (never more than there are
+idle threads) and runs them on a thread pool. SIGINT/SIGTERM stop
+claiming and let running tasks finish. --once drains the due tasks and
+exits, e.g. for cron or tests.
+"""
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from taskqueue import queue
+
+
+class Command(BaseCommand):
+    help = 'Claim and run queued background tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--batch', type=int, default=20, help='Most tasks claimed per query')
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds between polls when idle')
+        parser.add_argument('--lease', type=int, default=queue.LEASE_SECONDS,
+                            help='Seconds before a claimed task that has not finished may be claimed again')
+        parser.add_argument('--once', action='store_true', help='Exit once no task is due')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self._stop)
+
+        threads = options['threads']
+        self.succeeded = self.failed = 0
+        running = set()
+        self.stdout.write(f'Running tasks on {threads} thread(s); registered: {", ".join(sorted(queue.registry))}')
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='task') as pool:
+            while not self.stopping:
+                claimed = self._claim(min(threads - len(running), options['batch']), options['lease'])
+                for task in claimed:
+                    running.add(pool.submit(queue.execute, task))
+
+                if not running:
+                    if options['once'] and not claimed:
+                        break
+                    time.sleep(options['poll'])
+                    continue
+                # Wake when a thread frees up; with threads idle, also after a poll interval to claim more.
+                idle = len(running) < threads
+                done, running = wait(running, timeout=options['poll'] if idle else None, return_when=FIRST_COMPLETED)
+                self._count(done)
+            self._count(wait(running).done)
+        self.stdout.write(f'{self.succeeded} task(s) succeeded, {self.failed} failed or will be retried.')
+
+    def _claim(self, limit, lease):
+        if limit <= 0:
+            return []
+        try:
+            return queue.claim(limit, lease)
+        except DatabaseError as exc:
+            # e.g. "database is locked" under write load; try again next poll.
+            self.stderr.write(f'Claiming tasks failed: {exc}')
+            return []
+        finally:
+            close_old_connections()
+
+    def _count(self, futures):
+        for future in futures:
+            if future.result():
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def _stop(self, signum, frame):
+        self.stdout.write('Stopping after the running tasks finish...')
+        self.stopping = True
@@ -0,0 +1,127 @@
+"""
+Task queue - durable background tasks stored in the default database
+
+Register a function with @task and call fn.enqueue(**payload) from a view
+or signal: the Task row is written in the caller's transaction, so it is
+queued exactly when the change that caused it commits, and is dropped
+with it on rollback. `manage.py run_tasks` claims due tasks in batches
+and runs them on a thread pool.
+
+Claiming uses SELECT ... FOR UPDATE SKIP LOCKED where the backend has it
+(PostgreSQL, MySQL 8); elsewhere (SQLite) candidates are read and then
+claimed with a conditional UPDATE stamped with a fresh token, which is
+safe because SQLite serialises writers. A claim is a lease: a task still
+RUNNING after LEASE_SECONDS (worker died) is claimed again. Failures are
+retried with exponential backoff and jitter until max_attempts, then
+left FAILED.
+
+A task's body and the deletion of its row share one transaction, so its
+database writes commit at most once. Other effects (email, cache) may
+repeat after a crash, so tasks should tolerate running twice.
+"""
+import random
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+LEASE_SECONDS = 5 * 60
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 60 * 60
+
+# Task name -> function; filled in by @task as modules are imported.
+registry = {}
+
+
+def task(func=None, *, name=None, max_attempts=5):
+    """Register `func` as a task; adds func.enqueue(**payload) and func.task_name."""
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        registry[task_name] = func
+        func.task_name = task_name
+        func.enqueue = lambda delay=0, **payload: enqueue(
+            task_name, payload, delay=delay, max_attempts=max_attempts
+        )
+        return func
+    return register(func) if func else register
+
+
+def enqueue(name, payload=None, delay=0, max_attempts=5):
+    """Queue one call of task `name`; `payload` (JSON) becomes its keyword arguments."""
+    return Task.objects.create(
+        name=name, payload=payload or {}, max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_many(name, payloads, max_attempts=5):
+    """Queue a call of task `name` per payload, in one INSERT."""
+    now = timezone.now()
+    return Task.objects.bulk_create([
+        Task(name=name, payload=payload, max_attempts=max_attempts, run_at=now) for payload in payloads
+    ])
+
+
+def _claimable(now):
+    return Task.objects.filter(
+        Q(status=Task.Status.QUEUED, run_at__lte=now)
+        | Q(status=Task.Status.RUNNING, locked_until__lt=now)
+    )
+
+
+def claim(limit, lease=LEASE_SECONDS):
+    """Claim up to `limit` due tasks for this worker; returns them (status RUNNING)."""
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    claimed = {
+        'status': Task.Status.RUNNING, 'locked_by': token,
+        'locked_until': now + timedelta(seconds=lease), 'attempts': F('attempts') + 1,
+    }
+    due = _claimable(now).order_by('run_at', 'id')
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            Task.objects.filter(pk__in=ids).update(**claimed)
+    else:
+        # No row locks: read candidates, then claim them with one UPDATE that
+        # re-checks the condition, so rows another worker took meanwhile are skipped.
+        ids = list(due.values_list('id', flat=True)[:limit])
+        _claimable(now).filter(pk__in=ids).update(**claimed)
+    return list(Task.objects.filter(pk__in=ids, locked_by=token))
+
+
+def backoff(attempts):
+    """Seconds to wait before retry number `attempts` (1-based), jittered ±50%."""
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.5)
+
+
+def execute(claimed):
+    """Run one claimed task and record the outcome; returns True on success."""
+    close_old_connections()
+    try:
+        func = registry.get(claimed.name)
+        try:
+            if func is None:
+                raise LookupError(f'No task registered as {claimed.name!r}')
+            with transaction.atomic():
+                func(**claimed.payload)
+                if not Task.objects.filter(pk=claimed.pk, locked_by=claimed.locked_by).delete()[0]:
+                    # The lease lapsed and another worker took the task over; let that run win.
+                    transaction.set_rollback(True)
+            return True
+        except Exception:
+            retry = claimed.attempts < claimed.max_attempts
+            Task.objects.filter(pk=claimed.pk, locked_by=claimed.locked_by).update(
+                status=Task.Status.QUEUED if retry else Task.Status.FAILED,
+                run_at=timezone.now() + timedelta(seconds=backoff(claimed.attempts)) if retry else F('run_at'),
+                locked_by='', locked_until=None, last_error=traceback.format_exc(),
+            )
+            return False
+    finally:
+        close_old_connections()
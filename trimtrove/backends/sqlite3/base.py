@@ -0,0 +1,47 @@
+"""
+SQLite backend tuned for concurrent web workers
+
+Django's SQLite backend plus per-connection PRAGMAs, applied on connect:
+WAL journaling (readers no longer wait for the booking writers, and the
+reverse), synchronous=NORMAL (safe with WAL, no fsync per commit), a
+busy_timeout so writers queue for the lock instead of failing, and a
+larger page cache. Override or add pragmas with OPTIONS['pragmas'].
+
+Transactions start with BEGIN IMMEDIATE (OPTIONS['transaction_mode']):
+a deferred transaction that reads before it writes cannot wait for the
+write lock under WAL and fails with "database is locked" at once.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+# In order: switching to WAL itself waits for the busy timeout.
+PRAGMAS = {
+    'busy_timeout': 20000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,  # KiB
+    'temp_store': 'MEMORY',
+}
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**PRAGMAS, **params.pop('pragmas', {})}
+        self.transaction_mode = params.pop('transaction_mode', 'IMMEDIATE')
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"OPTIONS['transaction_mode'] must be one of {', '.join(TRANSACTION_MODES)}."
+            )
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -0,0 +1,243 @@
+"""
+Per-view performance metrics - request latency, SQL count/time and template render time
+
+MetricsMiddleware times every request and files it under the URL name
+(e.g. "customers:dashboard"). A sampled fraction of requests
+(METRICS_SAMPLE_RATE) also count their SQL queries and DB time through a
+connection execute wrapper, and their template render time through
+TimedDjangoTemplates. The per-request state lives in a context variable,
+so async views and sync_to_async threads are measured too. Unsampled
+requests pay for two perf_counter() calls and one locked update.
+
+Totals are per process and served at /metrics in Prometheus text format;
+scrape each worker (or run one) to see them all.
+"""
+import hmac
+import random
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+# Request latency histogram buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+UNRESOLVED = '<unresolved>'
+
+_current = ContextVar('trimtrove_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Counters for one sampled request."""
+    __slots__ = ('queries', 'db_seconds', 'render_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+
+
+class ViewStats:
+    """Running totals for one URL name."""
+
+    def __init__(self):
+        self.requests = {}  # status class ("2xx") -> count
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.seconds = 0.0
+        self.sampled = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.view_seconds = 0.0
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, status, seconds, sample=None):
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = ViewStats()
+            status_class = f'{status // 100}xx'
+            stats.requests[status_class] = stats.requests.get(status_class, 0) + 1
+            stats.buckets[bisect_left(BUCKETS, seconds)] += 1
+            stats.seconds += seconds
+            if sample is not None:
+                stats.sampled += 1
+                stats.queries += sample.queries
+                stats.db_seconds += sample.db_seconds
+                stats.render_seconds += sample.render_seconds
+                stats.view_seconds += seconds - sample.render_seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {view: _copy(stats) for view, stats in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+def _copy(stats):
+    copy = ViewStats()
+    copy.__dict__.update(stats.__dict__)
+    copy.requests = dict(stats.requests)
+    copy.buckets = list(stats.buckets)
+    return copy
+
+
+registry = Registry()
+
+
+def _timed_execute(execute, sql, params, many, context):
+    current = _current.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        current.queries += 1
+        current.db_seconds += perf_counter() - started
+
+
+def install_db_wrapper(sender=None, connection=None, **kwargs):
+    """Add the query timer to a connection (once; connections reconnect)."""
+    if _timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_timed_execute)
+
+
+connection_created.connect(install_db_wrapper)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        current = _current.get()
+        if current is None:
+            return super().render(context, request)
+        started = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            current.render_seconds += perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates whose templates add their render time to the current request's metrics."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class MetricsMiddleware:
+    """Record per-view metrics; put it first in MIDDLEWARE so it covers the whole stack."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+        # Connections opened before this module loaded (e.g. by startup checks).
+        for connection in connections.all(initialized_only=True):
+            install_db_wrapper(connection=connection)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _start(self):
+        sample = RequestMetrics() if random.random() < self.sample_rate else None
+        return sample, _current.set(sample), perf_counter()
+
+    def _finish(self, request, response, sample, token, started):
+        seconds = perf_counter() - started
+        _current.reset(token)
+        match = getattr(request, 'resolver_match', None)
+        registry.record(match.view_name if match else UNRESOLVED, response.status_code, seconds, sample)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        sample, token, started = self._start()
+        response = self.get_response(request)
+        self._finish(request, response, sample, token, started)
+        return response
+
+    async def __acall__(self, request):
+        sample, token, started = self._start()
+        response = await self.get_response(request)
+        self._finish(request, response, sample, token, started)
+        return response
+
+
+def _label(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def render_prometheus(snapshot):
+    """Prometheus text exposition (format 0.0.4) of a registry snapshot."""
+    families = [
+        ('trimtrove_requests_total', 'counter', 'Requests handled, by URL name and status class.'),
+        ('trimtrove_request_duration_seconds', 'histogram', 'Request latency through the whole middleware stack.'),
+        ('trimtrove_sampled_requests_total', 'counter', 'Requests that also recorded the DB and render metrics below.'),
+        ('trimtrove_db_queries_total', 'counter', 'SQL queries run by sampled requests.'),
+        ('trimtrove_db_seconds_total', 'counter', 'Time spent executing SQL in sampled requests.'),
+        ('trimtrove_template_render_seconds_total', 'counter', 'Template render time in sampled requests.'),
+        ('trimtrove_view_seconds_total', 'counter', 'Request time outside template rendering in sampled requests.'),
+    ]
+    lines = {name: [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}'] for name, kind, help_text in families}
+    for view in sorted(snapshot):
+        stats = snapshot[view]
+        label = f'view="{_label(view)}"'
+        for status_class, count in sorted(stats.requests.items()):
+            lines['trimtrove_requests_total'].append(
+                f'trimtrove_requests_total{{{label},status="{status_class}"}} {count}'
+            )
+        histogram = lines['trimtrove_request_duration_seconds']
+        cumulative = 0
+        for bound, count in zip((*BUCKETS, '+Inf'), stats.buckets):
+            cumulative += count
+            histogram.append(f'trimtrove_request_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+        histogram.append(f'trimtrove_request_duration_seconds_sum{{{label}}} {stats.seconds:.6f}')
+        histogram.append(f'trimtrove_request_duration_seconds_count{{{label}}} {cumulative}')
+        for name, value in (
+            ('trimtrove_sampled_requests_total', stats.sampled),
+            ('trimtrove_db_queries_total', stats.queries),
+            ('trimtrove_db_seconds_total', f'{stats.db_seconds:.6f}'),
+            ('trimtrove_template_render_seconds_total', f'{stats.render_seconds:.6f}'),
+            ('trimtrove_view_seconds_total', f'{stats.view_seconds:.6f}'),
+        ):
+            lines[name].append(f'{name}{{{label}}} {value}')
+    return '\n'.join(line for name, _, _ in families for line in lines[name]) + '\n'
+
+
+def metrics_view(request):
+    """
+    GET /metrics - Prometheus scrape endpoint.
+    Requires "Authorization: Bearer <METRICS_TOKEN>" when METRICS_TOKEN is
+    set; without a token it is only served in DEBUG.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        # Constant-time comparison, so response timing does not leak the token.
+        supplied = request.headers.get('Authorization', '').encode()
+        if not hmac.compare_digest(supplied, f'Bearer {token}'.encode()):
+            return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    elif not settings.DEBUG:
+        raise Http404
+    return HttpResponse(render_prometheus(registry.snapshot()), content_type='text/plain; version=0.0.4')
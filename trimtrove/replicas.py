@@ -0,0 +1,136 @@
+"""
+Read replicas - reads from a replica, writes and read-your-writes on the primary
+
+ReplicaRouter sends every write to "default" (the primary). Reads go to a
+replica (one of REPLICA_DATABASES, picked once per request) only while
+ReplicaMiddleware has marked the current request as replica-safe:
+- GET/HEAD/OPTIONS requests whose client has not written in the last
+  REPLICA_PIN_SECONDS (every other method sets a short-lived cookie), so
+  users see their own bookings and edits while the replicas catch up;
+- until the request itself writes, after which it reads the primary;
+- outside transactions on the primary, so atomic() blocks see their own rows.
+Everything else (POSTs, management commands, run_tasks) reads the primary,
+as does code inside use_primary(): derived data that is stored, such as
+occupancy index rows and slot cache entries, must not be built from a
+lagging copy. Writes made there do not count as the client's own, and
+sessions always live on the primary.
+
+Without REPLICA_DATABASES the middleware removes itself and every query
+goes to the primary.
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'primary_until'
+# Apps whose reads must never lag their writes.
+PRIMARY_ONLY_APPS = {'sessions'}
+
+_current = ContextVar('trimtrove_read_replica', default=None)
+
+
+class ReplicaState:
+    """Where the current request reads from."""
+    __slots__ = ('replica', 'wrote')
+
+    def __init__(self, replica):
+        self.replica = replica  # alias, or None to read the primary
+        self.wrote = False
+
+
+def replica_aliases():
+    return tuple(getattr(settings, 'REPLICA_DATABASES', ()))
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside this block; its writes do not pin the request."""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class ReplicaRouter:
+    """Database router for a primary ("default") plus REPLICA_DATABASES."""
+
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is None or state.replica is None or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            state.replica = None
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication.
+        return False if db in replica_aliases() else None
+
+
+class ReplicaMiddleware:
+    """Mark safe requests as replica-readable; pin clients that just wrote to the primary."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.replicas = replica_aliases()
+        if not self.replicas:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _pinned(self, request):
+        try:
+            return float(request.COOKIES[PIN_COOKIE]) > time.time()
+        except (KeyError, ValueError):
+            return False
+
+    def _start(self, request):
+        replica = None
+        if request.method in SAFE_METHODS and not self._pinned(request):
+            replica = random.choice(self.replicas)
+        state = ReplicaState(replica)
+        return state, _current.set(state)
+
+    def _finish(self, request, response, state, token):
+        _current.reset(token)
+        if state.wrote or request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, f'{time.time() + self.pin_seconds:.3f}',
+                max_age=self.pin_seconds, httponly=True, samesite='Lax',
+            )
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        state, token = self._start(request)
+        return self._finish(request, self.get_response(request), state, token)
+
+    async def __acall__(self, request):
+        state, token = self._start(request)
+        return self._finish(request, await self.get_response(request), state, token)
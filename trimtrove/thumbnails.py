@@ -0,0 +1,196 @@
+"""
+Thumbnails - resized JPEG/WebP variants of uploaded images, built off the request path
+
+Saving a model with a new image schedules a build once the transaction
+commits: a dispatcher thread reads the upload, a process pool resizes and
+re-encodes it at every THUMBNAIL_WIDTHS width narrower than the original,
+and the dispatcher stores the files and records them in the model's
+variants JSON field ({'source', 'width', 'files': {format: [[width, name]]}}).
+Until then Thumbs falls back to the original; a replaced image falls back
+again until its own variants are recorded. Recording bumps updated_at, so
+cached shop fragments and the dashboard feed pick the variants up.
+"""
+import io
+import logging
+import multiprocessing
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Preferred first: <source type="image/webp"> ahead of the JPEG <img>.
+FORMATS = ('webp', 'jpeg')
+QUALITY = 80
+DEFAULT_WIDTHS = (320, 640, 1280)
+
+_lock = threading.Lock()
+_pending = set()
+_pool = None
+_dispatcher = None
+
+
+def make_variants(data, widths):
+    """
+    (original width, {format: [(width, bytes)]}) for the encoded image `data`.
+    Runs in a worker process, so it only touches Pillow.
+    """
+    from PIL import Image, ImageOps, features
+
+    formats = [fmt for fmt in FORMATS if fmt != 'webp' or features.check('webp')]
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if 'A' in image.getbands() or 'transparency' in image.info:
+            # JPEG has no alpha; flatten onto white for both formats so they match.
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, 'white')
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        else:
+            image = image.convert('RGB')
+
+        variants = {fmt: [] for fmt in formats}
+        for width in sorted(widths):
+            if width >= image.width:
+                break
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                out = io.BytesIO()
+                if fmt == 'jpeg':
+                    resized.save(out, 'JPEG', quality=QUALITY, optimize=True, progressive=True)
+                else:
+                    resized.save(out, 'WEBP', quality=QUALITY, method=4)
+                variants[fmt].append((width, out.getvalue()))
+        return image.width, variants
+
+
+def is_current(field, variants):
+    """Whether `variants` were built from the image currently in `field`."""
+    return bool(field) and (variants or {}).get('source') == field.name
+
+
+class Thumbs:
+    """Template view of one image field's variants: .ready, .srcset, .webp_srcset."""
+
+    def __init__(self, field, variants):
+        self.field = field
+        self.variants = variants or {}
+
+    @property
+    def ready(self):
+        return is_current(self.field, self.variants) and bool(self.variants['files'].get('jpeg'))
+
+    def _srcset(self, fmt):
+        if not self.ready:
+            return ''
+        storage = self.field.storage
+        return ', '.join(f'{storage.url(name)} {width}w' for width, name in self.variants['files'].get(fmt, []))
+
+    @property
+    def srcset(self):
+        """JPEG variants plus the original at its own width."""
+        if not self.ready:
+            return ''
+        return f"{self._srcset('jpeg')}, {self.field.url} {self.variants['width']}w"
+
+    @property
+    def webp_srcset(self):
+        return self._srcset('webp')
+
+
+def worker_count():
+    return getattr(settings, 'THUMBNAIL_WORKERS', 2)
+
+
+def process_pool(workers=None):
+    # spawn, not fork: web workers are threaded and hold DB connections.
+    return ProcessPoolExecutor(
+        max_workers=workers or worker_count(),
+        mp_context=multiprocessing.get_context('spawn'),
+    )
+
+
+def build(model, pk, field_name, variants_field, pool):
+    """Build, store and record the variants of one row's image; returns the record, or None if skipped."""
+    instance = model.objects.filter(pk=pk).first()
+    field = getattr(instance, field_name, None)
+    if not field:
+        return None
+    source = field.name
+    with field.storage.open(source, 'rb') as f:
+        data = f.read()
+    widths = tuple(getattr(settings, 'THUMBNAIL_WIDTHS', DEFAULT_WIDTHS))
+    width, variants = pool.submit(make_variants, data, widths).result()
+
+    stem = posixpath.splitext(posixpath.basename(source))[0]
+    directory = posixpath.join(posixpath.dirname(source), 'thumbs')
+    files = {
+        fmt: [
+            [w, field.storage.save(f'{directory}/{stem}-{w}.{"jpg" if fmt == "jpeg" else fmt}', ContentFile(content))]
+            for w, content in sized
+        ]
+        for fmt, sized in variants.items()
+    }
+    record = {'source': source, 'width': width, 'files': files}
+    # Only if the image wasn't replaced meanwhile; the newer upload has its own build queued.
+    updated = model.objects.filter(pk=pk, **{field_name: source}).update(
+        **{variants_field: record, 'updated_at': timezone.now()}
+    )
+    new_names = _names(record)
+    stale = _names(getattr(instance, variants_field)) - new_names if updated else new_names
+    for name in stale:
+        field.storage.delete(name)
+    return record if updated else None
+
+
+def _names(record):
+    return {name for sized in (record or {}).get('files', {}).values() for _, name in sized}
+
+
+def _executors():
+    global _pool, _dispatcher
+    with _lock:
+        if _pool is None:
+            _pool = process_pool()
+            _dispatcher = ThreadPoolExecutor(max_workers=worker_count(), thread_name_prefix='thumbnails')
+    return _pool, _dispatcher
+
+
+def _run(model, pk, field_name, variants_field, key):
+    global _pool
+    pool = _executors()[0]
+    try:
+        build(model, pk, field_name, variants_field, pool)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM on a huge upload); start a fresh pool for the next build.
+        with _lock:
+            if _pool is pool:
+                _pool = process_pool()
+        logger.exception('Thumbnail worker died building %s for %s %s', field_name, model._meta.label, pk)
+    except Exception:
+        logger.exception('Building %s thumbnails failed for %s %s', field_name, model._meta.label, pk)
+    finally:
+        with _lock:
+            _pending.discard(key)
+        connections.close_all()
+
+
+def schedule(instance, field_name, variants_field):
+    """Build variants of instance.<field_name> in the background once the current transaction commits."""
+    model, pk = type(instance), instance.pk
+    key = (model._meta.label, pk, getattr(instance, field_name).name)
+
+    def submit():
+        with _lock:
+            if key in _pending:
+                return
+            _pending.add(key)
+        _executors()[1].submit(_run, model, pk, field_name, variants_field, key)
+
+    transaction.on_commit(submit)
@@ -6,11 +6,12 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
-from . import views as project_views
+from . import metrics, views as project_views
 
 urlpatterns = [
     path('', project_views.landing_page, name='landing'),
     path('admin/', admin.site.urls),
+    path('metrics', metrics.metrics_view, name='metrics'),
     path('auth/', include('authentication.urls', namespace='auth')),
     path('customer/', include('customers.urls', namespace='customers')),
     path('barber/', include('barbers.urls', namespace='barbers')),